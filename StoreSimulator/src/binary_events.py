@@ -0,0 +1,244 @@
+"""Binary Event Log
+
+This file contains a converter from a raw list of events to a compact binary
+format, and a reader that replays the binary format through a memory map.
+
+The binary format is:
+    - a header: magic bytes, format version, number of records, and the
+      offsets of the cid table and of its index;
+    - one fixed-width record per event: timestamp, kind, value and number of
+      items, where value is an index into the cid table for an arrival and
+      the line index for a closure;
+    - the cid table: every distinct cid once, in UTF-8, one per line;
+    - the cid index: the file offset of every cid in the table, then the
+      offset of the end of the table, 8 bytes each.
+All integers are little-endian.
+"""
+import mmap
+import struct
+import sys
+from array import array
+from event import CustomerArrival, CloseLine
+from event_stream import ARRIVE, CLOSE, read_records
+from closed_form import collect_events, run_closed_form
+from lane_engine import run_lanes
+
+_MAGIC = b'GSEV'
+_VERSION = 2
+# magic, version, number of records, offset of the cid table, offset of the
+# cid index
+_HEADER = struct.Struct('<4sIQQQ')
+# the offsets of a cid and of the next one in the cid index
+_CID_SPAN = struct.Struct('<QQ')
+# timestamp, kind, value, number of items
+_RECORD = struct.Struct('<qB3xII')
+# the kind codes used in records
+_KINDS = [ARRIVE, CLOSE]
+
+
+def convert(event_file, binary_file):
+    """Write the events stored in <event_file> to <binary_file> in the
+    binary format, and return the number of events written.
+
+    Only the cid table is held in memory, so the event file can be larger
+    than memory.
+
+    @type event_file: str
+        A filename referring to a raw list of events.
+    @type binary_file: str
+    @rtype: int
+    """
+    cid_indexes = {}
+    cids = []
+    count = 0
+    with open(binary_file, 'wb') as file:
+        # the header is rewritten once the counts are known
+        file.write(_HEADER.pack(_MAGIC, _VERSION, 0, 0, 0))
+        for timestamp, kind, value, num_items in read_records(event_file):
+            if kind == ARRIVE:
+                if value not in cid_indexes:
+                    cid_indexes[value] = len(cids)
+                    cids.append(value)
+                value = cid_indexes[value]
+            file.write(_RECORD.pack(timestamp, _KINDS.index(kind), value,
+                                    num_items))
+            count += 1
+        cid_offset = file.tell()
+        offsets = array('Q', [cid_offset])
+        for cid in cids:
+            file.write(cid.encode('utf-8') + b'\n')
+            offsets.append(file.tell())
+        index_offset = file.tell()
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+        file.write(offsets.tobytes())
+        file.seek(0)
+        file.write(_HEADER.pack(_MAGIC, _VERSION, count, cid_offset,
+                                index_offset))
+    return count
+
+
+class BinaryEventLog:
+    """A binary event log, read through a memory map.
+
+    Records are decoded straight from the mapped file without copying it.
+    Each cid is decoded and interned the first time a record refers to it,
+    so opening a log reads nothing but its header.
+    """
+    # === Private attributes ===
+    # @type _file: file
+    #     The open binary file.
+    # @type _map: mmap.mmap
+    #     The memory map of the file.
+    # @type _count: int
+    #     The number of records in the log.
+    # @type _cid_offset: int
+    #     The offset of the cid table in the file.
+    # @type _index_offset: int
+    #     The offset of the cid index in the file.
+    # @type _cids: dict[int, str]
+    #     The cids decoded so far, by their index in the cid table.
+
+    def __init__(self, binary_file):
+        """Open the binary event log stored in <binary_file>.
+
+        @type self: BinaryEventLog
+        @type binary_file: str
+        @rtype: None
+        """
+        self._file = open(binary_file, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._count, self._cid_offset, \
+            self._index_offset = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise ValueError(binary_file + ' is not a binary event log')
+        self._cids = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        """Return the number of records in this log.
+
+        @type self: BinaryEventLog
+        @rtype: int
+        """
+        return self._count
+
+    def cid(self, index):
+        """Return the cid at <index> in the cid table of this log.
+
+        @type self: BinaryEventLog
+        @type index: int
+        @rtype: str
+        """
+        cid = self._cids.get(index)
+        if cid is None:
+            start, end = _CID_SPAN.unpack_from(self._map,
+                                               self._index_offset + 8 * index)
+            # leave out the line's newline
+            cid = sys.intern(self._map[start:end - 1].decode('utf-8'))
+            self._cids[index] = cid
+        return cid
+
+    def close(self):
+        """Close this log.
+
+        @type self: BinaryEventLog
+        @rtype: None
+        """
+        self._map.close()
+        self._file.close()
+
+    def records(self):
+        """Yield every record of this log, in the order of the original
+        event file, as (timestamp, kind, value, num_items) tuples like those
+        of event_stream.read_records.
+
+        @type self: BinaryEventLog
+        @rtype: generator[(int, str, str | int, int)]
+        """
+        cids = self._cids
+        start = _HEADER.size
+        view = memoryview(self._map)[start:self._cid_offset]
+        try:
+            for timestamp, kind, value, num_items in _RECORD.iter_unpack(view):
+                if kind == 0:
+                    cid = cids.get(value)
+                    if cid is None:
+                        cid = self.cid(value)
+                    yield timestamp, ARRIVE, cid, num_items
+                else:
+                    yield timestamp, CLOSE, value, num_items
+        finally:
+            view.release()
+
+    def events(self):
+        """Yield an Event for every record of this log, in order.
+
+        Each Event is built straight from its unpacked record.
+
+        @type self: BinaryEventLog
+        @rtype: generator[Event]
+        """
+        cids = self._cids
+        view = memoryview(self._map)[_HEADER.size:self._cid_offset]
+        try:
+            for timestamp, kind, value, num_items in _RECORD.iter_unpack(view):
+                if kind == 0:
+                    cid = cids.get(value)
+                    if cid is None:
+                        cid = self.cid(value)
+                    yield CustomerArrival(timestamp, cid, num_items)
+                else:
+                    yield CloseLine(timestamp, value)
+        finally:
+            view.release()
+
+
+def replay(simulation, binary_file, mode='normal'):
+    """Run <simulation> on the events stored in <binary_file>, and return its
+    statistics as GroceryStoreSimulation.run does.
+
+    <mode> is any of simulation.MODES but 'checkpointed', and means what it
+    means for GroceryStoreSimulation.run; ValueError is raised as run raises
+    it, or if <mode> is 'checkpointed'. In 'closed_form' and 'lanes' mode the
+    log is run straight from the decoded records, without creating any
+    Events.
+
+    @type simulation: GroceryStoreSimulation
+    @type binary_file: str
+    @type mode: str
+        If the mode reads the events lazily, they must be sorted by
+        timestamp.
+    @rtype: dict[str, object]
+    """
+    simulation._check_mode(mode)
+    if mode == 'checkpointed':
+        raise ValueError('a binary event log cannot be replayed with '
+                         'checkpoints')
+    with BinaryEventLog(binary_file) as log:
+        # each generator is closed even if the run fails, to release its
+        # view of the map, which cannot be closed while the view is held
+        if mode in ['closed_form', 'lanes']:
+            records = log.records()
+            try:
+                if mode == 'closed_form':
+                    return simulation._stats(run_closed_form(
+                        simulation._store, *collect_events(records)))
+                return simulation._stats(run_lanes(
+                    simulation._store, *collect_events(records, True)))
+            finally:
+                records.close()
+        events = log.events()
+        try:
+            batched = mode in ['batched', 'streaming_batched']
+            if mode in ['streaming', 'streaming_batched']:
+                return simulation._run_events(events, True, batched)
+            return simulation._run_events(list(events), False, batched)
+        finally:
+            events.close()
@@ -0,0 +1,77 @@
+"""Multi-Store Simulation
+
+This file contains a driver that simulates a chain of independent grocery
+stores in parallel, and combines their statistics into chain-wide ones.
+"""
+import json
+import multiprocessing
+import os
+import sys
+from simulation import GroceryStoreSimulation, merge_stats
+
+
+def load_manifest(filename):
+    """Return the (config file, event file) pairs listed in the manifest
+    <filename>.
+
+    The manifest is a JSON list of objects with the keys 'config' and
+    'events'. Relative file names are relative to the manifest's folder.
+
+    @type filename: str
+    @rtype: list[(str, str)]
+    """
+    folder = os.path.dirname(os.path.abspath(filename))
+    with open(filename, 'r') as file:
+        entries = json.load(file)
+    return [(os.path.join(folder, entry['config']),
+             os.path.join(folder, entry['events'])) for entry in entries]
+
+
+def _run_store(task):
+    """Simulate one store and return its position and statistics.
+
+    @type task: (int, str, str)
+        The position of the store in the manifest, its configuration file
+        and its event file.
+    @rtype: (int, dict[str, object])
+    """
+    position, config_file, event_file = task
+    stats = GroceryStoreSimulation(config_file).run(event_file)
+    return position, stats
+
+
+def run_chain(stores, processes=None):
+    """Simulate every store in <stores>, and return the statistics of each
+    store and of the whole chain.
+
+    Workers take one store at a time from a shared queue as they become free,
+    so a worker that gets small stores keeps taking more while another is
+    busy with a large one. The stores with the largest event files are
+    handed out first, so that a large store is not left for the end.
+
+    @type stores: list[(str, str)]
+        (config file, event file) pairs, such as those from load_manifest.
+    @type processes: int | None
+        The number of worker processes, or None for one per CPU.
+    @rtype: (list[dict[str, object]], dict[str, object])
+        The statistics of each store, in the order of <stores>, and the
+        chain-wide statistics from merge_stats.
+    """
+    tasks = [(position, config_file, event_file)
+             for position, (config_file, event_file) in enumerate(stores)]
+    tasks.sort(key=lambda task: os.path.getsize(task[2]), reverse=True)
+    results = [None] * len(stores)
+    with multiprocessing.Pool(processes) as pool:
+        for position, stats in pool.imap_unordered(_run_store, tasks,
+                                                   chunksize=1):
+            results[position] = stats
+    return results, merge_stats(results)
+
+
+if __name__ == '__main__':
+    # usage: python chain.py <manifest> [processes]
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    per_store, chain_stats = run_chain(load_manifest(sys.argv[1]), workers)
+    for key in ['num_customers', 'total_time', 'max_wait', 'mean_wait',
+                'p50_wait', 'p95_wait', 'p99_wait']:
+        print('{}: {}'.format(key, chain_stats[key]))
@@ -0,0 +1,117 @@
+"""Simulation Checkpoints
+
+This file contains functions that save the state of a running
+GroceryStoreSimulation to a checkpoint file at regular intervals, and that
+resume a simulation from its latest checkpoint.
+
+A checkpoint holds the simulation itself (its event queue and its grocery
+store, with every line, customer and counter), the next unprocessed event
+of the event file and the byte offset to read on from, and the timestamp
+of the last event processed. It is pickled and compressed with zlib.
+"""
+import os
+import pickle
+import zlib
+from event_stream import stream_events_at
+
+# The version of the checkpoint contents.
+_VERSION = 1
+
+
+def save_checkpoint(filename, state):
+    """Write <state> to the checkpoint file <filename>.
+
+    The file is replaced in one step, so a crash while saving leaves the
+    previous checkpoint in place.
+
+    @type filename: str
+    @type state: dict[str, object]
+    @rtype: None
+    """
+    data = zlib.compress(pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+    temporary = filename + '.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, filename)
+
+
+def load_checkpoint(filename):
+    """Return the state stored in the checkpoint file <filename>.
+
+    @type filename: str
+    @rtype: dict[str, object]
+    """
+    with open(filename, 'rb') as file:
+        state = pickle.loads(zlib.decompress(file.read()))
+    if state.get('version') != _VERSION:
+        raise ValueError(filename + ' is not a supported checkpoint')
+    return state
+
+
+def _continue(state, checkpoint_file):
+    """Run the simulation in <state> to the end, saving checkpoints to
+    <checkpoint_file>, and return its statistics.
+
+    @type state: dict[str, object]
+    @type checkpoint_file: str
+    @rtype: dict[str, object]
+    """
+    simulation = state['simulation']
+    pending = state['pending']
+    if pending is None:
+        initial_events = iter([])
+    else:
+        initial_events = stream_events_at(state['event_file'], pending[1])
+
+    def save(pending, last_event_timestamp):
+        state['pending'] = pending
+        state['last_event_timestamp'] = last_event_timestamp
+        save_checkpoint(checkpoint_file, state)
+
+    last_event_timestamp = simulation._run_checkpointed(
+        initial_events, pending, state['last_event_timestamp'],
+        state['interval'], save)
+    return simulation._stats(last_event_timestamp)
+
+
+def run_checkpointed(simulation, event_file, checkpoint_file, interval):
+    """Run <simulation> on the events stored in <event_file>, saving a
+    checkpoint to <checkpoint_file> after every <interval> events, and
+    return its statistics.
+
+    Events are read lazily from the file, so the events in the file must be
+    sorted by timestamp.
+
+    @type simulation: GroceryStoreSimulation
+    @type event_file: str
+    @type checkpoint_file: str
+    @type interval: int
+    @rtype: dict[str, object]
+    """
+    initial_events = stream_events_at(event_file)
+    state = {
+        'version': _VERSION,
+        'simulation': simulation,
+        'event_file': os.path.abspath(event_file),
+        'pending': next(initial_events, None),
+        'last_event_timestamp': None,
+        'interval': interval
+    }
+    # the first event has already been read, so reading goes on from there
+    if state['pending'] is not None:
+        initial_events.close()
+    return _continue(state, checkpoint_file)
+
+
+def resume(checkpoint_file):
+    """Resume the simulation saved in <checkpoint_file>, keep saving
+    checkpoints to it, and return the statistics of the whole simulation.
+
+    The statistics are the same as if the simulation had never stopped.
+
+    @type checkpoint_file: str
+    @rtype: dict[str, object]
+    """
+    return _continue(load_checkpoint(checkpoint_file), checkpoint_file)
@@ -0,0 +1,169 @@
+"""Closed-Form Lane Simulation
+
+This file contains a fast path that runs a simulation without creating or
+queueing any events. A customer's finish time follows from the recurrence
+    finish_i = max(arrival_i, finish_{i-1}) + process_time(items_i)
+over the customers of the same line, so it is known as soon as they join a
+line: only the line loads at each arrival, which decide assign_line, have to
+be tracked.
+
+A closure breaks the recurrence only for the customers it sends back: they
+leave the closed line, keep their join times, and join new lines as
+arrivals at the time of the closure, where the recurrence picks them up
+again.
+"""
+import heapq
+from array import array
+from collections import deque
+from event_stream import ARRIVE
+from store import Customer
+
+
+def collect_events(records, with_cids=False):
+    """Return the timestamps, item counts and closed lines of the events in
+    <records>, sorted by timestamp with ties in record order.
+
+    The closed line of an arrival is -1, and the item count of a closure is
+    0. If <with_cids> is True, the cids of the events are returned too, as a
+    fourth list in the same order, with None for a closure.
+
+    @type records: iterable[(int, str, str | int, int)]
+    @type with_cids: bool
+    @rtype: (array[int], array[int], array[int])
+            | (array[int], array[int], array[int], list[str | None])
+    """
+    timestamps = array('q')
+    items = array('q')
+    lines = array('q')
+    cids = []
+    for timestamp, kind, value, num_items in records:
+        timestamps.append(timestamp)
+        items.append(num_items)
+        if kind == ARRIVE:
+            lines.append(-1)
+        else:
+            lines.append(value)
+        if with_cids:
+            cids.append(value if kind == ARRIVE else None)
+    # sort only if needed; sorted is stable, so ties keep their order
+    if any(timestamps[i] > timestamps[i + 1]
+           for i in range(len(timestamps) - 1)):
+        order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+        timestamps = array('q', [timestamps[i] for i in order])
+        items = array('q', [items[i] for i in order])
+        lines = array('q', [lines[i] for i in order])
+        if with_cids:
+            cids = [cids[i] for i in order]
+    if with_cids:
+        return timestamps, items, lines, cids
+    return timestamps, items, lines
+
+
+def run_closed_form(store, timestamps, items, lines):
+    """Run the events at <timestamps> with <items> and <lines> at <store>,
+    and return the timestamp of the last event, as the event loop would.
+
+    The customers are never added to <store>: each one holds a place in
+    their line, through GroceryStore.hold_places, so that assign_line sees
+    the line loads the event loop would, and record_finish records them
+    when they finish. Afterwards <store> has the same customer count, wait
+    statistics, line counts and closed lines as after the event loop, and
+    every line is empty again.
+
+    The event loop processes initial events before spawned events with the
+    same timestamp, and spawned events in the order they were spawned. So
+    at time t, the arrivals and closures at t happen first, in order, then
+    the customers finishing at t leave, and only then do the customers sent
+    back by the closures at t join new lines, in the order they stood in.
+    In particular, a customer stops counting toward the load of its line
+    only for arrivals strictly after its finish time.
+
+    @type store: GroceryStore
+        A store with no customers in it.
+    @type timestamps: array[int]
+        Sorted event times.
+    @type items: array[int]
+        The number of items of each arriving customer.
+    @type lines: array[int]
+        The line each closure closes, or -1 for an arrival.
+    @rtype: int | None
+    """
+    num_lines = len(store.lines_served)
+    # the finish time of the last customer to join each line
+    last_finish = [None] * num_lines
+    # (finish time, number of items, join time) of every customer in each
+    # line, front first
+    queued = [deque() for _ in range(num_lines)]
+    # (finish time, line index) of every customer in a line; the entries of
+    # customers sent back by a closure are left behind, and skipped
+    leaving = []
+    last_event_timestamp = None
+
+    def join(num_items, join_time, now):
+        # put a customer in the line assign_line picks for them at <now>
+        line_index = store.assign_line(Customer(None, num_items))
+        if line_index is None:
+            raise ValueError('no line has room for the customer arriving '
+                             'at {}'.format(now))
+        start = now
+        if last_finish[line_index] is not None and \
+                last_finish[line_index] > now:
+            start = last_finish[line_index]
+        finish = start + store.process_time(line_index, num_items)
+        last_finish[line_index] = finish
+        queued[line_index].append((finish, num_items, join_time))
+        store.hold_places(line_index, 1)
+        heapq.heappush(leaving, (finish, line_index))
+
+    def leave(before):
+        # the customers finishing before <before> leave their lines, and the
+        # finish time of the last one is returned
+        last = None
+        while len(leaving) > 0 and leaving[0][0] < before:
+            finish, line_index = heapq.heappop(leaving)
+            line = queued[line_index]
+            # a closed line keeps only the customer at its front, and no one
+            # joins it again, so any other entry for it is left behind
+            if len(line) == 0 or line[0][0] != finish:
+                continue
+            store.record_finish(line_index, finish - line.popleft()[2])
+            last = finish
+        return last
+
+    i = 0
+    while i < len(timestamps):
+        now = timestamps[i]
+        leave(now)
+        # the customers sent back by the closures at <now>, as (number of
+        # items, join time), in the order they stood in
+        displaced = []
+        while i < len(timestamps) and timestamps[i] == now:
+            line_index = lines[i]
+            if line_index < 0:
+                join(items[i], now, now)
+            else:
+                # the line holds no customers, so close_c only closes it
+                store.close_c(line_index)
+                line = queued[line_index]
+                # everyone but the customer at the front leaves
+                sent_back = []
+                while len(line) > 1:
+                    customer = line.pop()
+                    sent_back.append((customer[1], customer[2]))
+                if len(sent_back) > 0:
+                    store.hold_places(line_index, -len(sent_back))
+                sent_back.reverse()
+                displaced.extend(sent_back)
+            i += 1
+        last_event_timestamp = now
+        if len(displaced) > 0:
+            # the customers finishing at <now> leave before the displaced
+            # customers join their new lines
+            leave(now + 1)
+            for num_items, join_time in displaced:
+                join(num_items, join_time, now)
+    # everyone left still finishes
+    last = leave(float('inf'))
+    if last is not None:
+        last_event_timestamp = last
+    return last_event_timestamp
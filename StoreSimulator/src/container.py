@@ -6,6 +6,8 @@ and Priority Queue data types.
 You are responsible for completing the 'add' method of
 PriorityQueue.
 """
+# heapq provides the binary heap operations used by HeapPriorityQueue.
+import heapq
 
 
 class Container:
@@ -23,6 +25,18 @@ class Container:
         """
         raise NotImplementedError
 
+    def extend(self, items):
+        """Add every item in <items> to this Container, in order.
+
+        Child classes may override this with a faster bulk load.
+
+        @type self: Container
+        @type items: iterable
+        @rtype: None
+        """
+        for item in items:
+            self.add(item)
+
     def remove(self):
         """Remove and return a single item from this Container.
 
@@ -31,6 +45,22 @@ class Container:
         """
         raise NotImplementedError
 
+    def peek(self):
+        """Return the item that remove would return, without removing it.
+
+        @type self: Container
+        @rtype: object
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove every item from this Container.
+
+        @type self: Container
+        @rtype: None
+        """
+        raise NotImplementedError
+
     def is_empty(self):
         """Return True iff this Container is empty.
 
@@ -96,6 +126,24 @@ class PriorityQueue(Container):
         """
         return self._items.pop(0)
 
+    def peek(self):
+        """Return the next item in this PriorityQueue without removing it.
+
+        Precondition: <self> should not be empty.
+
+        @type self: PriorityQueue
+        @rtype: object
+
+        >>> pq = PriorityQueue()
+        >>> pq.add('fred')
+        >>> pq.add('arju')
+        >>> pq.peek()
+        'arju'
+        >>> pq.remove()
+        'arju'
+        """
+        return self._items[0]
+
     def is_empty(self):
         """
         Return true iff this PriorityQueue is empty.
@@ -112,6 +160,20 @@ class PriorityQueue(Container):
         """
         return len(self._items) == 0
 
+    def clear(self):
+        """Remove every item from this PriorityQueue.
+
+        @type self: PriorityQueue
+        @rtype: None
+
+        >>> pq = PriorityQueue()
+        >>> pq.add('fred')
+        >>> pq.clear()
+        >>> pq.is_empty()
+        True
+        """
+        self._items.clear()
+
     def add(self, item):
         """Add <item> to this PriorityQueue.
 
@@ -146,3 +208,168 @@ class PriorityQueue(Container):
         else:
             # add <item> before the item at index i
             self._items.insert(i, item)
+
+    def extend(self, items):
+        """Add every item in <items> to this PriorityQueue, in order.
+
+        This sorts once instead of inserting one item at a time. The sort is
+        stable, so ties keep FIFO order.
+
+        @type self: PriorityQueue
+        @type items: iterable
+        @rtype: None
+
+        >>> pq = PriorityQueue()
+        >>> pq.add('fred')
+        >>> pq.extend(['arju', 'mona', 'hat'])
+        >>> pq._items
+        ['arju', 'fred', 'hat', 'mona']
+        """
+        self._items.extend(items)
+        self._items.sort()
+
+
+class HeapPriorityQueue(Container):
+    """A queue of items that operates in priority order, backed by a binary
+    heap.
+
+    This has the same interface and ordering rules as PriorityQueue: the item
+    with the highest priority is removed first, and ties are resolved in FIFO
+    order. Both add and remove take O(log n) time instead of O(n).
+
+    All objects in the container must be of the same type.
+    """
+    # === Private Attributes ===
+    # @type _items: list[(object, int)]
+    #     The heap of (item, sequence number) pairs.
+    # @type _count: int
+    #     The sequence number given to the next item that is added.
+    #
+    # === Representation Invariants ===
+    # _items satisfies the heap property, so _items[0] holds the item with the
+    # highest priority.
+    # Sequence numbers are unique and increase in insertion order, so among
+    # items of equal priority the one added earliest is removed first.
+
+    def __init__(self):
+        """Initialize an empty HeapPriorityQueue.
+
+        @type self: HeapPriorityQueue
+        @rtype: None
+        """
+        self._items = []
+        self._count = 0
+
+    def remove(self):
+        """Remove and return the next item from this HeapPriorityQueue.
+
+        Precondition: <self> should not be empty.
+
+        @type self: HeapPriorityQueue
+        @rtype: object
+
+        >>> pq = HeapPriorityQueue()
+        >>> pq.add('fred')
+        >>> pq.add('arju')
+        >>> pq.add('mona')
+        >>> pq.add('hat')
+        >>> pq.remove()
+        'arju'
+        >>> pq.remove()
+        'fred'
+        >>> pq.remove()
+        'hat'
+        >>> pq.remove()
+        'mona'
+        """
+        return heapq.heappop(self._items)[0]
+
+    def peek(self):
+        """Return the next item in this HeapPriorityQueue without removing it.
+
+        Precondition: <self> should not be empty.
+
+        @type self: HeapPriorityQueue
+        @rtype: object
+
+        >>> pq = HeapPriorityQueue()
+        >>> pq.add('fred')
+        >>> pq.add('arju')
+        >>> pq.peek()
+        'arju'
+        >>> pq.remove()
+        'arju'
+        """
+        return self._items[0][0]
+
+    def is_empty(self):
+        """
+        Return true iff this HeapPriorityQueue is empty.
+
+        @type self: HeapPriorityQueue
+        @rtype: bool
+
+        >>> pq = HeapPriorityQueue()
+        >>> pq.is_empty()
+        True
+        >>> pq.add('fred')
+        >>> pq.is_empty()
+        False
+        """
+        return len(self._items) == 0
+
+    def clear(self):
+        """Remove every item from this HeapPriorityQueue.
+
+        The list holding the heap is emptied in place, so it is reused by the
+        items added afterwards.
+
+        @type self: HeapPriorityQueue
+        @rtype: None
+
+        >>> pq = HeapPriorityQueue()
+        >>> pq.add('fred')
+        >>> pq.clear()
+        >>> pq.is_empty()
+        True
+        """
+        self._items.clear()
+        self._count = 0
+
+    def add(self, item):
+        """Add <item> to this HeapPriorityQueue.
+
+        @type self: HeapPriorityQueue
+        @type item: object
+        @rtype: None
+
+        >>> pq = HeapPriorityQueue()
+        >>> pq.add('fred')
+        >>> pq.add('arju')
+        >>> len(pq._items)
+        2
+        """
+        # the sequence number breaks ties between items of equal priority
+        heapq.heappush(self._items, (item, self._count))
+        self._count += 1
+
+    def extend(self, items):
+        """Add every item in <items> to this HeapPriorityQueue, in order.
+
+        The items are appended and the heap is rebuilt in a single O(n)
+        heapify pass, which is faster than calling add once per item.
+
+        @type self: HeapPriorityQueue
+        @type items: iterable
+        @rtype: None
+
+        >>> pq = HeapPriorityQueue()
+        >>> pq.add('fred')
+        >>> pq.extend(['arju', 'mona', 'hat'])
+        >>> [pq.remove() for _ in range(4)]
+        ['arju', 'fred', 'hat', 'mona']
+        """
+        for item in items:
+            self._items.append((item, self._count))
+            self._count += 1
+        heapq.heapify(self._items)
@@ -0,0 +1,380 @@
+"""Assignment 1 - Grocery Store Events (Task 2)
+
+This file contains all of the classes necessary to model the different
+kinds of events in the simulation.
+
+A raw list of events has one event per line, either
+    <timestamp> Arrive <cid> <num_items>
+or
+    <timestamp> Close <line_index>
+and blank lines are ignored.
+"""
+from store import Customer
+
+# The kinds of events in a raw list of events.
+ARRIVE = 'Arrive'
+CLOSE = 'Close'
+
+# The name of every Event class, at the index given by its <kind>.
+KINDS = ['CustomerArrival', 'CheckoutStarted', 'CheckoutCompleted',
+         'CloseLine']
+
+
+class Event:
+    """An event.
+
+    Events have an ordering that is based on the event timestamp: Events with
+    older timestamps are less than those with newer timestamps.
+
+    This class is abstract; subclasses must implement do().
+
+    === Attributes ===
+    @type timestamp: int
+        A timestamp for this event.
+    """
+    __slots__ = ('timestamp',)
+
+    def __init__(self, timestamp):
+        """Initialize an Event with a given timestamp.
+
+        @type self: Event
+        @type timestamp: int
+            A timestamp for this event.
+            Precondition: must be a non-negative integer.
+        @rtype: None
+
+        >>> Event(7).timestamp
+        7
+        """
+        self.timestamp = timestamp
+
+    # The following six 'magic methods' are overridden to allow for easy
+    # comparison of Event instances. All comparisons simply perform the
+    # same comparison on the 'timestamp' attribute of the two events.
+    def __eq__(self, other):
+        """Return True iff this Event is equal to <other>.
+
+        Two events are equal iff they have the same timestamp.
+
+        @type self: Event
+        @type other: Event
+        @rtype: bool
+
+        >>> first = Event(1)
+        >>> second = Event(2)
+        >>> first == second
+        False
+        >>> second.timestamp = first.timestamp
+        >>> first == second
+        True
+        """
+        return self.timestamp == other.timestamp
+
+    def __ne__(self, other):
+        """Return True iff this Event is not equal to <other>.
+
+        @type self: Event
+        @type other: Event
+        @rtype: bool
+        """
+        return not self == other
+
+    def __lt__(self, other):
+        """Return True iff this Event is less than <other>.
+
+        @type self: Event
+        @type other: Event
+        @rtype: bool
+        """
+        return self.timestamp < other.timestamp
+
+    def __le__(self, other):
+        """Return True iff this Event is less than or equal to <other>.
+
+        @type self: Event
+        @type other: Event
+        @rtype: bool
+        """
+        return self.timestamp <= other.timestamp
+
+    def __gt__(self, other):
+        """Return True iff this Event is greater than <other>.
+
+        @type self: Event
+        @type other: Event
+        @rtype: bool
+        """
+        return not self <= other
+
+    def __ge__(self, other):
+        """Return True iff this Event is greater than or equal to <other>.
+
+        @type self: Event
+        @type other: Event
+        @rtype: bool
+        """
+        return not self < other
+
+    def do(self, store):
+        """Perform this Event.
+
+        Call methods on <store> to update its state according to the
+        meaning of the event. Note: the "business logic" of what actually
+        happens should not be handled in any Event classes.
+
+        @type self: Event
+        @type store: GroceryStore
+            The grocery store to perform the event on.
+        @rtype: list[Event]
+            A list of new events spawned by this event (to be added to
+            the simulation's event queue).
+        """
+        raise NotImplementedError
+
+
+class CustomerArrival(Event):
+    """A customer arrives at the checkout area ready to check out.
+
+    === Attributes ===
+    @type cid: str
+        The unique string assigned to the customer.
+    @type num_items: int
+        The number of items the customer is carrying.
+    @type join_time: int | None
+        The time the customer first joined a line, for a customer sent back
+        by a closed line, or None for a customer new to the store.
+    """
+    __slots__ = ('cid', 'num_items', 'join_time')
+    # the index of the class in KINDS
+    kind = 0
+
+    def __init__(self, timestamp, cid, num_items, join_time=None):
+        """Initialize a CustomerArrival.
+
+        @type self: CustomerArrival
+        @type timestamp: int
+        @type cid: str
+        @type num_items: int
+        @type join_time: int | None
+        @rtype: None
+        """
+        Event.__init__(self, timestamp)
+        self.cid = cid
+        self.num_items = num_items
+        self.join_time = join_time
+
+    def do(self, store):
+        """Put the customer in the line assign_line picks for them, and start
+        their checkout if no one is ahead of them.
+
+        A customer sent back by a closed line keeps the join time of the
+        line they first joined.
+
+        @type self: CustomerArrival
+        @type store: GroceryStore
+        @rtype: list[Event]
+        """
+        line_index = store.assign_line(Customer(self.cid, self.num_items))
+        if line_index is None:
+            raise ValueError('no line has room for the customer arriving at '
+                             '{}'.format(self.timestamp))
+        store.add_customer(self.cid, self.num_items, line_index)
+        join_time = self.timestamp if self.join_time is None \
+            else self.join_time
+        store.set_join_time(store.find_customer(self.cid), join_time)
+        # the customer is the only one in the line
+        if store.find_cashier_line(line_index).curr_cap == 1:
+            return [CheckoutStarted(self.timestamp, line_index)]
+        return []
+
+
+class CheckoutStarted(Event):
+    """The customer at the front of a line starts checking out.
+
+    === Attributes ===
+    @type line: int
+        The index of the line.
+    """
+    __slots__ = ('line',)
+    # the index of the class in KINDS
+    kind = 1
+
+    def __init__(self, timestamp, line):
+        """Initialize a CheckoutStarted.
+
+        @type self: CheckoutStarted
+        @type timestamp: int
+        @type line: int
+        @rtype: None
+        """
+        Event.__init__(self, timestamp)
+        self.line = line
+
+    def do(self, store):
+        """Return the completion of the checkout of the customer at the front
+        of the line.
+
+        @type self: CheckoutStarted
+        @type store: GroceryStore
+        @rtype: list[Event]
+        """
+        finish_time = self.timestamp + store.process_c(self.line)
+        cid = store.front_customer(self.line).cid
+        return [CheckoutCompleted(finish_time, self.line, cid)]
+
+
+class CheckoutCompleted(Event):
+    """A customer finishes checking out and leaves their line.
+
+    === Attributes ===
+    @type line: int
+        The index of the line.
+    @type cid: str
+        The unique string assigned to the customer.
+    """
+    __slots__ = ('line', 'cid')
+    # the index of the class in KINDS
+    kind = 2
+
+    def __init__(self, timestamp, line, cid):
+        """Initialize a CheckoutCompleted.
+
+        @type self: CheckoutCompleted
+        @type timestamp: int
+        @type line: int
+        @type cid: str
+        @rtype: None
+        """
+        Event.__init__(self, timestamp)
+        self.line = line
+        self.cid = cid
+
+    def do(self, store):
+        """Take the customer out of the line, and start the checkout of the
+        next customer in it, if there is one.
+
+        @type self: CheckoutCompleted
+        @type store: GroceryStore
+        @rtype: list[Event]
+        """
+        store.set_finish_time(store.find_customer(self.cid), self.timestamp)
+        store.remove_customer_front(self.line)
+        if not store.is_empty(self.line):
+            return [CheckoutStarted(self.timestamp, self.line)]
+        return []
+
+
+class CloseLine(Event):
+    """A checkout line gets closed.
+
+    === Attributes ===
+    @type line: int
+        The index of the line.
+    """
+    __slots__ = ('line',)
+    # the index of the class in KINDS
+    kind = 3
+
+    def __init__(self, timestamp, line):
+        """Initialize a CloseLine.
+
+        @type self: CloseLine
+        @type timestamp: int
+        @type line: int
+        @rtype: None
+        """
+        Event.__init__(self, timestamp)
+        self.line = line
+
+    def do(self, store):
+        """Close the line, and return an arrival for every customer who has
+        to leave it, in the order they stood in.
+
+        @type self: CloseLine
+        @type store: GroceryStore
+        @rtype: list[Event]
+        """
+        return [CustomerArrival(self.timestamp, customer.cid,
+                                customer.num_items, customer.join_time)
+                for customer in reversed(store.close_c(self.line))]
+
+
+def record_from_line(line):
+    """Return the record (timestamp, kind, value, num_items) described by
+    <line> of a raw list of events, or None if <line> is blank.
+
+    <kind> is ARRIVE or CLOSE, <value> is the cid of an arrival or the line
+    index of a closure, and <num_items> is 0 for a closure.
+
+    Raise ValueError if <line> does not describe an event.
+
+    @type line: str
+    @rtype: (int, str, str | int, int) | None
+
+    >>> record_from_line('10 Arrive Tamara 7\\n')
+    (10, 'Arrive', 'Tamara', 7)
+    >>> record_from_line('4 Close 0')
+    (4, 'Close', 0, 0)
+    >>> record_from_line('5 Arrive x')
+    Traceback (most recent call last):
+    ...
+    ValueError: not an event: '5 Arrive x'
+    """
+    tokens = line.split()
+    # blank lines have no event
+    if len(tokens) == 0:
+        return None
+    try:
+        if len(tokens) == 4 and tokens[1] == ARRIVE:
+            return int(tokens[0]), ARRIVE, tokens[2], int(tokens[3])
+        if len(tokens) == 3 and tokens[1] == CLOSE:
+            return int(tokens[0]), CLOSE, int(tokens[2]), 0
+    except ValueError:
+        # a timestamp, item count or line index that is not an integer
+        pass
+    raise ValueError('not an event: {!r}'.format(line.strip()))
+
+
+def event_from_line(line):
+    """Return the Event described by <line> of a raw list of events, or None
+    if <line> is blank.
+
+    Raise ValueError if <line> does not describe an event.
+
+    @type line: str
+    @rtype: Event | None
+
+    >>> event = event_from_line('10 Arrive Tamara 7\\n')
+    >>> (event.timestamp, event.cid, event.num_items)
+    (10, 'Tamara', 7)
+    >>> event_from_line('4 Close 0').line
+    0
+    >>> event_from_line('  \\n') is None
+    True
+    """
+    record = record_from_line(line)
+    if record is None:
+        return None
+    timestamp, kind, value, num_items = record
+    if kind == ARRIVE:
+        return CustomerArrival(timestamp, value, num_items)
+    return CloseLine(timestamp, value)
+
+
+def create_event_list(filename):
+    """Return a list of Events based on raw list of events in <filename>.
+
+    Precondition: the file stored at <filename> is in the format specified
+    by the assignment handout.
+
+    @type filename: str
+        The name of a file that contains the list of events.
+    @rtype: list[Event]
+    """
+    events = []
+    with open(filename, 'r') as file:
+        for line in file:
+            event = event_from_line(line)
+            if event is not None:
+                events.append(event)
+    return events
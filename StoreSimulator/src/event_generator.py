@@ -0,0 +1,226 @@
+"""Synthetic Event Generator
+
+This file contains functions that write large, reproducible raw lists of
+events for load testing the grocery store simulation. Events are written in
+the usual format, one per line and sorted by timestamp:
+    <timestamp> Arrive <cid> <num_items>
+    <timestamp> Close <line_index>
+"""
+import argparse
+import heapq
+import math
+import random
+
+# The number of lines written to the file at once.
+_WRITE_BATCH = 10000
+
+
+def uniform_items(low, high):
+    """Return an item count distribution that picks a number of items
+    uniformly between <low> and <high>, inclusive.
+
+    @type low: int
+        Precondition: 1 <= low <= high
+    @type high: int
+    @rtype: (random.Random) -> int
+    """
+    return lambda rng: rng.randint(low, high)
+
+
+def geometric_items(mean):
+    """Return an item count distribution that picks a number of items from a
+    geometric distribution with the given <mean>, so most customers carry a
+    few items and some carry many.
+
+    @type mean: float
+        Precondition: mean >= 1
+    @rtype: (random.Random) -> int
+    """
+    if mean <= 1:
+        return lambda rng: 1
+    # the chance that a customer stops picking items after each item
+    log_stay = math.log(1 - 1 / mean)
+    return lambda rng: 1 + int(math.log(1.0 - rng.random()) / log_stay)
+
+
+def weighted_items(weights):
+    """Return an item count distribution that picks each number of items in
+    <weights> with the relative weight given for it.
+
+    @type weights: dict[int, float]
+        Precondition: every key is at least 1
+    @rtype: (random.Random) -> int
+    """
+    counts = list(weights)
+    cumulative = []
+    total = 0
+    for count in counts:
+        total += weights[count]
+        cumulative.append(total)
+    return lambda rng: rng.choices(counts, cum_weights=cumulative)[0]
+
+
+def _arrival_rate(timestamp, rate, rushes):
+    """Return the arrival rate at <timestamp>.
+
+    @type timestamp: float
+    @type rate: float
+    @type rushes: list[(int, int, float)]
+    @rtype: float
+    """
+    for start, end, multiplier in rushes:
+        if start <= timestamp < end:
+            return rate * multiplier
+    return rate
+
+
+def generate_arrivals(rng, num_customers, rate, items, rushes=()):
+    """Yield (timestamp, cid, num_items) for <num_customers> customers who
+    arrive as a Poisson process, in order of timestamp.
+
+    The process is simulated in continuous time and timestamps are rounded
+    down, so several customers may share a timestamp.
+
+    @type rng: random.Random
+    @type num_customers: int
+    @type rate: float
+        The mean number of arrivals per unit of time outside rush hours.
+    @type items: (random.Random) -> int
+        The item count distribution.
+    @type rushes: list[(int, int, float)]
+        Rush hours as (start, end, multiplier): between <start> and <end>
+        the arrival rate is multiplied by <multiplier>.
+    @rtype: generator[(int, str, int)]
+    """
+    # customers are generated at the highest rate and then kept with the
+    # probability of the actual rate over the highest rate (thinning)
+    peak = rate * max([1.0] + [rush[2] for rush in rushes])
+    now = 0.0
+    customer = 0
+    while customer < num_customers:
+        now += rng.expovariate(peak)
+        if rng.random() * peak <= _arrival_rate(now, rate, rushes):
+            yield int(now), 'c' + str(customer), items(rng)
+            customer += 1
+
+
+def generate_closures(rng, num_lines, storms):
+    """Return a sorted list of (timestamp, line_index) line closures.
+
+    Each line is closed at most once, and at least one line is never closed.
+
+    @type rng: random.Random
+    @type num_lines: int
+    @type storms: list[(int, int, int)]
+        Closure storms as (start, count, spread): <count> lines close at
+        random times between <start> and <start> + <spread>.
+    @rtype: list[(int, int)]
+    """
+    # the lines that can still be closed, in random order
+    lines = list(range(num_lines))
+    rng.shuffle(lines)
+    # keep one line open
+    if len(lines) > 0:
+        lines.pop()
+    closures = []
+    for start, count, spread in storms:
+        for _ in range(min(count, len(lines))):
+            closures.append((start + rng.randrange(max(spread, 1)),
+                             lines.pop()))
+    closures.sort()
+    return closures
+
+
+def write_events(filename, num_customers, rate=1.0, items=None, rushes=(),
+                 num_lines=0, storms=(), seed=0):
+    """Write a raw list of events to <filename> and return the number of
+    events written.
+
+    The file is written as the events are generated, so memory use does not
+    depend on <num_customers>. The same arguments always produce the same
+    file.
+
+    @type filename: str
+    @type num_customers: int
+    @type rate: float
+        The mean number of arrivals per unit of time outside rush hours.
+    @type items: (random.Random) -> int | None
+        The item count distribution, or None for uniform_items(1, 15).
+    @type rushes: list[(int, int, float)]
+        Rush hours, as for generate_arrivals.
+    @type num_lines: int
+        The number of lines in the store, used to pick lines to close.
+    @type storms: list[(int, int, int)]
+        Closure storms, as for generate_closures.
+    @type seed: int
+    @rtype: int
+    """
+    if items is None:
+        items = uniform_items(1, 15)
+    rng = random.Random(seed)
+    closures = generate_closures(rng, num_lines, storms)
+    arrivals = generate_arrivals(rng, num_customers, rate, items, rushes)
+    # arrivals sort before closures with the same timestamp
+    lines = heapq.merge(
+        ((timestamp, 0, '{} Arrive {} {}\n'.format(timestamp, cid, num_items))
+         for timestamp, cid, num_items in arrivals),
+        ((timestamp, 1, '{} Close {}\n'.format(timestamp, line_index))
+         for timestamp, line_index in closures))
+    written = 0
+    batch = []
+    with open(filename, 'w') as file:
+        for _, _, line in lines:
+            batch.append(line)
+            if len(batch) == _WRITE_BATCH:
+                file.writelines(batch)
+                written += len(batch)
+                batch = []
+        file.writelines(batch)
+        written += len(batch)
+    return written
+
+
+def _parse_triples(text, kinds):
+    """Return the comma-separated triples in <text>, such as '10:20:3,50:60:2',
+    converted with <kinds>.
+
+    @type text: str
+    @type kinds: (type, type, type)
+    @rtype: list[tuple]
+    """
+    triples = []
+    for part in text.split(','):
+        if part:
+            values = part.split(':')
+            triples.append(tuple(kind(value)
+                                 for kind, value in zip(kinds, values)))
+    return triples
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Write a synthetic raw list of events.')
+    parser.add_argument('filename')
+    parser.add_argument('customers', type=int)
+    parser.add_argument('--rate', type=float, default=1.0,
+                        help='mean arrivals per unit of time')
+    parser.add_argument('--items', default='uniform:1:15',
+                        help='uniform:<low>:<high> or geometric:<mean>')
+    parser.add_argument('--rush', default='',
+                        help='rush hours as start:end:multiplier,...')
+    parser.add_argument('--lines', type=int, default=0,
+                        help='number of lines in the store')
+    parser.add_argument('--storm', default='',
+                        help='closure storms as start:count:spread,...')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    kind, *values = args.items.split(':')
+    if kind == 'geometric':
+        distribution = geometric_items(float(values[0]))
+    else:
+        distribution = uniform_items(int(values[0]), int(values[1]))
+    print(write_events(args.filename, args.customers, args.rate, distribution,
+                       _parse_triples(args.rush, (int, int, float)),
+                       args.lines, _parse_triples(args.storm, (int, int, int)),
+                       args.seed))
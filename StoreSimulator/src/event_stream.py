@@ -0,0 +1,75 @@
+"""Streaming Event Reader
+
+This file contains generators that read a raw list of events lazily, so a
+simulation does not need to hold the whole event file in memory.
+
+Events can be read either as Event objects, or as records: tuples of
+(timestamp, kind, value, num_items), where <kind> is ARRIVE or CLOSE,
+<value> is the <cid> of an arrival or the line index of a closure, and
+<num_items> is 0 for a closure.
+"""
+from event import ARRIVE, CLOSE, event_from_line, record_from_line
+
+
+def stream_events(event_file):
+    """Yield the Events stored in <event_file>, in file order.
+
+    Only the line being parsed is held in memory, and each line is turned
+    into an Event by event_from_line, as create_event_list does, so events
+    read this way are exactly the ones a full read of the file would
+    produce.
+
+    Precondition: the event file is a valid list of events.
+
+    @type event_file: str
+        A filename referring to a raw list of events.
+    @rtype: generator[Event]
+    """
+    with open(event_file, 'r') as file:
+        for line in file:
+            event = event_from_line(line)
+            if event is not None:
+                yield event
+
+
+def stream_events_at(event_file, offset=0):
+    """Yield (event, end) for each Event stored in <event_file> from the
+    byte offset <offset> on, where <end> is the byte offset just after the
+    event's line. Reading can later continue from any <end>.
+
+    Precondition: the event file is a valid list of events, and <offset> is
+    0 or the end of one of its lines.
+
+    @type event_file: str
+    @type offset: int
+    @rtype: generator[(Event, int)]
+    """
+    with open(event_file, 'rb') as file:
+        file.seek(offset)
+        for line in file:
+            offset += len(line)
+            event = event_from_line(line.decode('utf-8'))
+            # blank lines have no event
+            if event is not None:
+                yield event, offset
+
+
+def read_records(event_file):
+    """Yield a record for each event stored in <event_file>, in file order.
+
+    Each line is turned into a record by event.record_from_line, which
+    event_from_line is built on, so a line is accepted here exactly when
+    stream_events and create_event_list accept it.
+
+    Raise ValueError at the first line that does not describe an event.
+
+    @type event_file: str
+        A filename referring to a raw list of events.
+    @rtype: generator[(int, str, str | int, int)]
+    """
+    with open(event_file, 'r') as file:
+        for line in file:
+            record = record_from_line(line)
+            # blank lines have no record
+            if record is not None:
+                yield record
@@ -0,0 +1,236 @@
+"""Event Trace
+
+This file contains the EventTrace class, which records one row per event of a
+GroceryStoreSimulation into a fixed-size ring buffer, and load_trace, which
+reads a trace written to disk back into arrays.
+
+Each row holds the event's timestamp, the kind of event (its index in
+event.KINDS), the line it acted on, the cid of the customer it acted on, and
+the number of customers in that line after the event. A closure acts on no
+customer, so its cid is None.
+
+The trace file format is:
+    - a header: magic bytes, format version, whether the columns are
+      little-endian, and the number of bytes of kind names, followed by the
+      names of the kinds, in UTF-8, one per line;
+    - any number of blocks, each holding:
+        - the number of rows, of cids and of bytes of cids;
+        - the cids of the block's rows, in UTF-8, one per line; cids are
+          numbered in the order they first appear in the block;
+        - the columns of the rows: timestamps (8 bytes each), kinds (4 bytes
+          each), lines (4 bytes each), cids (numbers in the block's cids,
+          or -1, 4 bytes each) and queue depths (4 bytes each).
+"""
+import struct
+import sys
+from array import array
+from event import KINDS
+
+_MAGIC = b'GSTR'
+_VERSION = 2
+# magic, version, whether the columns are little-endian, number of bytes of
+# kind names
+_HEADER = struct.Struct('<4sI?3xI')
+# number of rows, number of cids, number of bytes of cids
+_BLOCK = struct.Struct('<III')
+# the array type code of each column, in file order
+_COLUMNS = [('timestamps', 'q'), ('kinds', 'i'), ('lines', 'i'),
+            ('cids', 'i'), ('depths', 'i')]
+# the kinds of event, as numbered by event.KINDS
+_ARRIVAL, _STARTED, _COMPLETED, _CLOSE = range(4)
+
+
+class EventTrace:
+    """A trace of the events of a simulation, kept in a ring buffer.
+
+    The buffer holds <capacity> rows. Without a file, it keeps the latest
+    <capacity> rows, overwriting the oldest. With a file, the buffer is
+    written to the file each time it fills up and at every flush, so the
+    file holds every row.
+
+    Each row is kept in the buffer as a tuple, which costs one store per
+    event; the rows are only split into typed columns when the buffer is
+    written.
+
+    === Attributes ===
+    @type capacity: int
+        The number of rows the buffer holds.
+    @type count: int
+        The number of rows recorded in total.
+    """
+    # === Private attributes ===
+    # @type _rows: list[(int, int, int, str | None, int) | None]
+    #     The buffer: a (timestamp, kind, line, cid, depth) row, with the
+    #     kind as numbered by event.KINDS, or None, at each position. The
+    #     cids are only numbered when the buffer is written, so the trace
+    #     holds no more cids than rows.
+    # @type _next: int
+    #     The position in the buffer of the next row.
+    # @type _file: file | None
+    #     The open trace file, or None.
+
+    def __init__(self, capacity=65536, filename=None):
+        """Initialize an empty EventTrace.
+
+        @type self: EventTrace
+        @type capacity: int
+            Must be positive.
+        @type filename: str | None
+            The file to write the trace to, or None to keep it in memory.
+        @rtype: None
+        """
+        self.capacity = capacity
+        self.count = 0
+        self._rows = [None] * capacity
+        self._next = 0
+        self._file = None
+        if filename is not None:
+            kind_names = ''.join(kind + '\n' for kind in KINDS).encode(
+                'utf-8')
+            self._file = open(filename, 'wb')
+            self._file.write(_HEADER.pack(_MAGIC, _VERSION,
+                                          sys.byteorder == 'little',
+                                          len(kind_names)))
+            self._file.write(kind_names)
+
+    def record_event(self, event, spawned, store):
+        """Record a row for <event>, which has just been done at <store> and
+        spawned the events <spawned>.
+
+        @type self: EventTrace
+        @type event: Event
+        @type spawned: list[Event]
+        @type store: GroceryStore
+        @rtype: None
+        """
+        kind = event.kind
+        if kind == _ARRIVAL:
+            cid = event.cid
+            line = store.find_cashier_line_index(cid)
+        elif kind == _COMPLETED:
+            cid = event.cid
+            line = event.line
+        elif kind == _STARTED:
+            # the completion it spawns names the customer checking out
+            cid = spawned[0].cid
+            line = event.line
+        else:
+            cid = None
+            line = event.line
+        i = self._next
+        self._rows[i] = (event.timestamp, kind, line, cid,
+                         store.find_cashier_line(line).curr_cap)
+        self.count += 1
+        i += 1
+        self._next = i
+        if i == self.capacity:
+            if self._file is not None:
+                self.flush()
+            else:
+                # wrap around, overwriting the oldest rows
+                self._next = 0
+
+    def flush(self):
+        """Write the rows in the buffer to the trace file, if there is one,
+        and empty the buffer.
+
+        @type self: EventTrace
+        @rtype: None
+        """
+        if self._file is None or self._next == 0:
+            return
+        size = self._next
+        # split the rows into columns, in file order
+        columns = list(zip(*self._rows[:size]))
+        # number the cids of this block's rows in the order they first
+        # appear, and the missing cid of a closure -1
+        block_cids = dict.fromkeys(columns[3])
+        block_cids.pop(None, None)
+        numbers = {cid: number for number, cid in enumerate(block_cids)}
+        numbers[None] = -1
+        columns[3] = [numbers[cid] for cid in columns[3]]
+        cids = ''.join(cid + '\n' for cid in block_cids).encode('utf-8')
+        self._file.write(_BLOCK.pack(size, len(block_cids), len(cids)))
+        self._file.write(cids)
+        for (_, code), column in zip(_COLUMNS, columns):
+            self._file.write(array(code, column))
+        self._file.flush()
+        self._next = 0
+
+    def rows(self):
+        """Return the rows in the buffer, oldest first, as (timestamp, kind,
+        line, cid, depth) tuples.
+
+        @type self: EventTrace
+        @rtype: list[(int, str, int, str | None, int)]
+        """
+        size = min(self.count, self.capacity)
+        if self._file is not None:
+            size = self._next
+        rows = []
+        for j in range(size):
+            # the oldest row follows the newest once the buffer has wrapped
+            timestamp, kind, line, cid, depth = \
+                self._rows[(self._next - size + j) % self.capacity]
+            rows.append((timestamp, KINDS[kind], line, cid, depth))
+        return rows
+
+    def close(self):
+        """Flush the buffer and close the trace file, if there is one.
+
+        @type self: EventTrace
+        @rtype: None
+        """
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def load_trace(filename):
+    """Return the columns of the trace file <filename>.
+
+    @type filename: str
+    @rtype: dict[str, array | list[str | None]]
+        An array for each of 'timestamps', 'kinds', 'lines' and 'depths',
+        with one item per row; 'cids', the list of the rows' cids, with None
+        for a row without a customer; and 'kind_names', the list of names
+        that the numbers in 'kinds' refer to.
+    """
+    columns = {name: array(code) for name, code in _COLUMNS
+               if name != 'cids'}
+    cids = []
+    with open(filename, 'rb') as file:
+        magic, version, little, names_size = _HEADER.unpack(
+            file.read(_HEADER.size))
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError('{} is not a version {} trace file'.format(
+                filename, _VERSION))
+        kind_names = file.read(names_size).decode('utf-8').split('\n')[:-1]
+        swap = little != (sys.byteorder == 'little')
+        while True:
+            block = file.read(_BLOCK.size)
+            if len(block) < _BLOCK.size:
+                break
+            num_rows, num_cids, cids_size = _BLOCK.unpack(block)
+            block_cids = file.read(cids_size).decode('utf-8').split(
+                '\n')[:num_cids]
+            for name, code in _COLUMNS:
+                column = array(code)
+                column.frombytes(file.read(column.itemsize * num_rows))
+                if swap:
+                    column.byteswap()
+                if name == 'cids':
+                    cids.extend(None if number == -1 else block_cids[number]
+                                for number in column)
+                else:
+                    columns[name].extend(column)
+    columns['cids'] = cids
+    columns['kind_names'] = kind_names
+    return columns
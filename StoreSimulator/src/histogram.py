@@ -0,0 +1,220 @@
+"""Wait Time Histogram
+
+This file contains the WaitHistogram class, which summarizes the wait times
+of any number of customers in a fixed amount of memory.
+"""
+import math
+
+# The number of buckets for each power of two. Values below 2 * _SUB_BUCKETS
+# get a bucket each; larger values share a bucket with values within
+# 1 / _SUB_BUCKETS of them.
+_SUB_BUCKETS = 64
+
+
+def _bucket(value):
+    """Return the index of the bucket holding <value>.
+
+    @type value: int
+        Precondition: value >= 0
+    @rtype: int
+
+    >>> _bucket(5)
+    5
+    >>> _bucket(127)
+    127
+    >>> _bucket(128) == _bucket(129)
+    True
+    """
+    if value < _SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - _SUB_BUCKETS.bit_length()
+    return _SUB_BUCKETS * (shift + 1) + (value >> shift) - _SUB_BUCKETS
+
+
+def _bucket_low(index):
+    """Return the smallest value held by the bucket at <index>.
+
+    @type index: int
+    @rtype: int
+
+    >>> _bucket_low(_bucket(1000)) <= 1000
+    True
+    """
+    if index < _SUB_BUCKETS:
+        return index
+    shift = index // _SUB_BUCKETS - 1
+    return (_SUB_BUCKETS + index % _SUB_BUCKETS) << shift
+
+
+class WaitHistogram:
+    """A histogram of wait times.
+
+    Wait times are counted in fixed buckets, so memory use does not depend on
+    the number of wait times recorded. Quantiles are exact for wait times
+    below 128, and otherwise within 1/64 of the true value. Two histograms
+    can be merged, so histograms from separate runs can be combined.
+
+    === Attributes ===
+    @type count: int
+        The number of wait times recorded.
+    @type total: int
+        The sum of the wait times recorded.
+    @type max: int | None
+        The largest wait time recorded, or None if none were recorded.
+
+    >>> h = WaitHistogram()
+    >>> for wait in [3, 1, 4, 1, 5, 9, 2, 6]:
+    ...     h.record(wait)
+    >>> h.quantile(0.5)
+    3
+    >>> h.quantile(0.99)
+    9
+    >>> h.mean()
+    3.875
+    """
+    # === Private attributes ===
+    # @type _counts: list[int]
+    #    The number of wait times in each bucket. Its length is bounded by
+    #    the bucket index of the largest wait time.
+
+    def __init__(self):
+        """Initialize an empty WaitHistogram.
+
+        @type self: WaitHistogram
+        @rtype: None
+        """
+        self.count = 0
+        self.total = 0
+        self.max = None
+        self._counts = []
+
+    def __eq__(self, other):
+        """Return whether <self> and <other> hold the same wait times.
+
+        @type self: WaitHistogram
+        @type other: WaitHistogram
+        @rtype: bool
+        """
+        return (type(other) == WaitHistogram and self.count == other.count and
+                self.total == other.total and self.max == other.max and
+                self._counts == other._counts)
+
+    def record(self, wait):
+        """Record a wait time of <wait>.
+
+        @type self: WaitHistogram
+        @type wait: int
+            Precondition: wait >= 0
+        @rtype: None
+        """
+        index = _bucket(wait)
+        if index >= len(self._counts):
+            self._counts.extend([0] * (index + 1 - len(self._counts)))
+        self._counts[index] += 1
+        self.count += 1
+        self.total += wait
+        if self.max is None or wait > self.max:
+            self.max = wait
+
+    def merge(self, other):
+        """Add every wait time recorded in <other> to <self>.
+
+        @type self: WaitHistogram
+        @type other: WaitHistogram
+        @rtype: None
+
+        >>> a = WaitHistogram()
+        >>> a.record(2)
+        >>> b = WaitHistogram()
+        >>> b.record(8)
+        >>> a.merge(b)
+        >>> a.count, a.max
+        (2, 8)
+        """
+        if len(other._counts) > len(self._counts):
+            self._counts.extend([0] * (len(other._counts) -
+                                       len(self._counts)))
+        for i in range(len(other._counts)):
+            self._counts[i] += other._counts[i]
+        self.count += other.count
+        self.total += other.total
+        if other.max is not None and (self.max is None or
+                                      other.max > self.max):
+            self.max = other.max
+
+    def copy(self):
+        """Return a new WaitHistogram holding the same wait times as <self>.
+
+        @type self: WaitHistogram
+        @rtype: WaitHistogram
+        """
+        copy = WaitHistogram()
+        copy.merge(self)
+        return copy
+
+    def since(self, earlier):
+        """Return a new WaitHistogram holding the wait times recorded in
+        <self> after it was copied to <earlier>.
+
+        The exact largest of those wait times is not known, so the <max> of
+        the result is only as accurate as its bucket.
+
+        @type self: WaitHistogram
+        @type earlier: WaitHistogram
+            A copy of <self> made before the recent wait times were recorded.
+        @rtype: WaitHistogram
+
+        >>> h = WaitHistogram()
+        >>> h.record(40)
+        >>> earlier = h.copy()
+        >>> h.record(2)
+        >>> h.record(6)
+        >>> recent = h.since(earlier)
+        >>> recent.count, recent.max, recent.quantile(0.5)
+        (2, 6, 2)
+        """
+        recent = WaitHistogram()
+        recent._counts = list(self._counts)
+        for i in range(len(earlier._counts)):
+            recent._counts[i] -= earlier._counts[i]
+        # drop the empty buckets at the end
+        while len(recent._counts) > 0 and recent._counts[-1] == 0:
+            recent._counts.pop()
+        recent.count = self.count - earlier.count
+        recent.total = self.total - earlier.total
+        if recent.count > 0:
+            # the largest value of the highest bucket, but no more than the
+            # largest wait time recorded
+            recent.max = min(self.max, _bucket_low(len(recent._counts)) - 1)
+        return recent
+
+    def mean(self):
+        """Return the mean wait time, or None if none were recorded.
+
+        @type self: WaitHistogram
+        @rtype: float | None
+        """
+        if self.count == 0:
+            return None
+        return self.total / self.count
+
+    def quantile(self, q):
+        """Return the smallest wait time such that a fraction <q> of the
+        recorded wait times are at most that time, or None if none were
+        recorded.
+
+        @type self: WaitHistogram
+        @type q: float
+            Precondition: 0 <= q <= 1
+        @rtype: int | None
+        """
+        if self.count == 0:
+            return None
+        # the rank of the wait time we are looking for, starting from 1
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for i in range(len(self._counts)):
+            seen += self._counts[i]
+            if seen >= rank:
+                return min(_bucket_low(i), self.max)
+        return self.max
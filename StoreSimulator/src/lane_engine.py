@@ -0,0 +1,128 @@
+"""Lane Engine
+
+This file contains an engine that runs a grocery store simulation with one
+pending event per checkout line instead of one per customer.
+
+Each line only needs the finish time of the customer at its front: the
+customers behind them start when they finish. So the queue holds, for every
+line with customers, the time its front customer finishes, and when that
+customer leaves, the next one starts and the line's entry is replaced. The
+queue never holds more entries than there are lines, however long the lines
+get.
+
+Customers go through the same GroceryStore methods as in the event loop:
+add_customer and set_join_time when they arrive, process_c and
+set_finish_time when they reach the front, and remove_customer_front when
+they finish. A closed line's customers are taken off by close_c and put back
+by readmit, at the point where the event loop would process their arrivals.
+"""
+from container import HeapPriorityQueue
+from store import Customer
+
+
+def run_lanes(store, timestamps, items, lines, cids):
+    """Run the events at <timestamps> with <items>, <lines> and <cids> at
+    <store>, and return the timestamp of the last event, as the event loop
+    would.
+
+    The event loop processes initial events before spawned events with the
+    same timestamp, and spawned events in the order they were spawned. So
+    at time t, the arrivals and closures at t happen first, in order, then
+    the customers finishing at t leave, and only then do the customers sent
+    back by the closures at t join new lines, in the order they stood in.
+
+    @type store: GroceryStore
+        A store with no customers in it.
+    @type timestamps: array[int]
+        Sorted event times.
+    @type items: array[int]
+        The number of items of each arriving customer.
+    @type lines: array[int]
+        The line each closure closes, or -1 for an arrival.
+    @type cids: list[str | None]
+        The cid of each arriving customer.
+    @rtype: int | None
+    """
+    # (finish time, line index) of the customer at the front of every line
+    # with customers
+    completions = HeapPriorityQueue()
+    # whether each line has an entry in <completions>
+    busy = [False] * len(store.lines_served)
+    last_event_timestamp = None
+    i = 0
+    while i < len(timestamps):
+        now = timestamps[i]
+        # customers finishing before <now> leave first
+        while not completions.is_empty() and completions.peek()[0] < now:
+            last_event_timestamp = _complete(store, completions, busy)
+        # the customers sent back by the closures at <now>, in the order
+        # they stood in
+        displaced = []
+        while i < len(timestamps) and timestamps[i] == now:
+            if lines[i] >= 0:
+                displaced.extend(reversed(store.close_c(lines[i])))
+                i += 1
+                continue
+            line_index = store.assign_line(Customer(cids[i], items[i]))
+            if line_index is None:
+                raise ValueError('no line has room for the customer '
+                                 'arriving at {}'.format(now))
+            store.add_customer(cids[i], items[i], line_index)
+            store.set_join_time(store.find_customer(cids[i]), now)
+            # a customer joining an empty line starts checking out right
+            # away
+            if not busy[line_index]:
+                _start(store, completions, busy, line_index, now)
+            i += 1
+        last_event_timestamp = now
+        if len(displaced) > 0:
+            # the customers finishing at <now> leave before the displaced
+            # customers join their new lines
+            while not completions.is_empty() and \
+                    completions.peek()[0] == now:
+                _complete(store, completions, busy)
+            for line_index in store.readmit(displaced):
+                if line_index is None:
+                    raise ValueError('no line has room for a customer of a '
+                                     'line closed at {}'.format(now))
+                if not busy[line_index]:
+                    _start(store, completions, busy, line_index, now)
+    while not completions.is_empty():
+        last_event_timestamp = _complete(store, completions, busy)
+    return last_event_timestamp
+
+
+def _start(store, completions, busy, line_index, now):
+    """Start checking out the customer at the front of the line at
+    <line_index> at time <now>, and queue the time they finish.
+
+    @type store: GroceryStore
+    @type completions: HeapPriorityQueue
+    @type busy: list[bool]
+    @type line_index: int
+    @type now: int
+    @rtype: None
+    """
+    finish = now + store.process_c(line_index)
+    store.set_finish_time(store.front_customer(line_index), finish)
+    completions.add((finish, line_index))
+    busy[line_index] = True
+
+
+def _complete(store, completions, busy):
+    """Remove the customer who finishes first from their line, start the
+    customer behind them, and return the time the customer finished.
+
+    @type store: GroceryStore
+    @type completions: HeapPriorityQueue
+        Precondition: not empty.
+    @type busy: list[bool]
+    @rtype: int
+    """
+    finish, line_index = completions.remove()
+    store.remove_customer_front(line_index)
+    if store.is_empty(line_index):
+        busy[line_index] = False
+    else:
+        _start(store, completions, busy, line_index, finish)
+    return finish
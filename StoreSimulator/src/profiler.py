@@ -0,0 +1,112 @@
+"""Event Profiler
+
+This file contains the EventProfiler class, which records where the time of
+a GroceryStoreSimulation goes: per kind of event, and per GroceryStore
+method.
+"""
+import time
+
+# The GroceryStore methods timed by an EventProfiler.
+STORE_METHODS = ['assign_line', 'is_empty', 'add_customer', 'find_customer',
+                 'find_cashier_line_index', 'find_cashier_line',
+                 'front_customer', 'remove_customer_front',
+                 'remove_customer_back', 'close_c', 'readmit', 'process_c',
+                 'set_join_time', 'set_finish_time']
+
+
+class EventProfiler:
+    """A profiler of the events and store method calls of a simulation.
+
+    === Attributes ===
+    @type events: dict[str, list[int | float]]
+        For each event class name, [number of events, seconds spent in
+        their do method, number of events they spawned].
+    @type methods: dict[str, list[int | float]]
+        For each GroceryStore method name, [number of calls, seconds spent
+        in it]. The time of a method includes the methods it calls.
+    """
+
+    def __init__(self):
+        """Initialize an EventProfiler that has recorded nothing.
+
+        @type self: EventProfiler
+        @rtype: None
+        """
+        self.events = {}
+        self.methods = {}
+
+    def attach_store(self, store):
+        """Time every call of a STORE_METHODS method of <store>.
+
+        The methods are wrapped on the <store> instance only, so other
+        stores are not affected.
+
+        @type self: EventProfiler
+        @type store: GroceryStore
+        @rtype: None
+        """
+        for name in STORE_METHODS:
+            self.methods[name] = [0, 0.0]
+            setattr(store, name, self._timed(getattr(store, name),
+                                             self.methods[name]))
+
+    @staticmethod
+    def _timed(method, totals):
+        """Return <method> wrapped so that each call adds 1 to totals[0] and
+        the time it takes to totals[1].
+
+        @type method: callable
+        @type totals: list[int | float]
+        @rtype: callable
+        """
+        def wrapper(*args):
+            start = time.perf_counter()
+            try:
+                return method(*args)
+            finally:
+                totals[0] += 1
+                totals[1] += time.perf_counter() - start
+        return wrapper
+
+    def run_event(self, event, store):
+        """Return event.do(store), and record its time and fan-out.
+
+        @type self: EventProfiler
+        @type event: Event
+        @type store: GroceryStore
+        @rtype: list[Event]
+        """
+        start = time.perf_counter()
+        spawned = event.do(store)
+        seconds = time.perf_counter() - start
+        name = type(event).__name__
+        totals = self.events.get(name)
+        if totals is None:
+            totals = self.events[name] = [0, 0.0, 0]
+        totals[0] += 1
+        totals[1] += seconds
+        totals[2] += len(spawned)
+        return spawned
+
+    def report(self):
+        """Return a text table of the recorded events and method calls,
+        slowest first.
+
+        @type self: EventProfiler
+        @rtype: str
+        """
+        lines = ['{:<24} {:>10} {:>10} {:>10} {:>8}'.format(
+            'event', 'count', 'seconds', 'us/event', 'fan-out')]
+        for name, (count, seconds, spawned) in sorted(
+                self.events.items(), key=lambda item: -item[1][1]):
+            lines.append('{:<24} {:>10} {:>10.3f} {:>10.2f} {:>8.2f}'.format(
+                name, count, seconds, 1e6 * seconds / count, spawned / count))
+        lines.append('')
+        lines.append('{:<24} {:>10} {:>10} {:>10}'.format(
+            'store method', 'calls', 'seconds', 'us/call'))
+        for name, (count, seconds) in sorted(
+                self.methods.items(), key=lambda item: -item[1][1]):
+            if count > 0:
+                lines.append('{:<24} {:>10} {:>10.3f} {:>10.2f}'.format(
+                    name, count, seconds, 1e6 * seconds / count))
+        return '\n'.join(lines)
@@ -0,0 +1,279 @@
+"""Simulation Result Cache
+
+This file contains the ResultCache class, which keeps the statistics of
+simulation runs on disk, so that running the same configuration on the same
+events again returns the saved statistics instead of simulating again.
+
+A run is identified by a SHA-256 hash of the cache version tag, of the
+configuration and of the content of the event file, so renaming or touching
+a file does not change its key, but editing it does. Every run mode gives
+the same statistics, so the mode is not part of the key.
+
+Each entry is a file in the cache directory, named after its key. Entries
+are written to a temporary file and renamed into place, so another process
+sees either the whole entry or none of it. When the entries take up more
+than the size limit, the least recently used ones are removed, along with
+any old temporary file a writer that died left behind. An entry that cannot
+be read back is treated as missing and removed.
+"""
+import hashlib
+import importlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from simulation import GroceryStoreSimulation
+from store import StoreConfig
+
+# The modules whose code decides the statistics of a run.
+_SIMULATION_MODULES = ['simulation', 'store', 'event', 'event_stream',
+                       'container', 'histogram', 'closed_form',
+                       'lane_engine', 'checkpoint']
+
+# The file name extension of cache entries.
+_SUFFIX = '.stats'
+
+# The file name extension of entries being written.
+_TEMPORARY_SUFFIX = '.tmp'
+
+# How old, in seconds, a temporary file must be to count as left behind by
+# a writer that died before renaming it. Writing an entry takes a fraction
+# of a second.
+_STALE_TEMPORARY_AGE = 3600
+
+# The errors pickle.load may raise on a truncated or corrupt entry.
+_CORRUPT_ERRORS = (pickle.UnpicklingError, EOFError, AttributeError,
+                   ImportError, IndexError, TypeError, ValueError)
+
+# The content hash of each event file hashed, by absolute path, with the
+# modification time and size of the file when it was hashed.
+_event_hashes = {}
+
+
+def _source_hash():
+    """Return the SHA-256 hash of the source of the simulation modules.
+
+    @rtype: str
+    """
+    digest = hashlib.sha256()
+    for name in _SIMULATION_MODULES:
+        module = importlib.import_module(name)
+        with open(module.__file__, 'rb') as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+# The version tag of the statistics. It changes with any change to the
+# simulation modules, so entries saved by older code are not used.
+CACHE_VERSION = _source_hash()
+
+
+def _event_hash(event_file):
+    """Return the SHA-256 hash of the content of <event_file>.
+
+    The file is only read again if it has changed since the last call.
+
+    @type event_file: str
+    @rtype: str
+    """
+    status = os.stat(event_file)
+    path = os.path.abspath(event_file)
+    version = (status.st_mtime_ns, status.st_size)
+    cached = _event_hashes.get(path)
+    if cached is None or cached[0] != version:
+        digest = hashlib.sha256()
+        with open(event_file, 'rb') as file:
+            while True:
+                block = file.read(1 << 20)
+                if len(block) == 0:
+                    break
+                digest.update(block)
+        cached = (version, digest.hexdigest())
+        _event_hashes[path] = cached
+    return cached[1]
+
+
+class ResultCache:
+    """A cache of simulation statistics in a directory on disk.
+
+    Any number of processes may use the same directory at once.
+
+    === Attributes ===
+    @type directory: str
+        The directory holding the entries.
+    @type max_bytes: int
+        The size the entries are kept under.
+    @type version: str
+        The version tag that is part of every key.
+    @type hits: int
+        The number of runs whose statistics were found in the cache.
+    @type misses: int
+        The number of runs that were simulated.
+    """
+    # === Private Attributes ===
+    # @type _total: int | None
+    #     The number of bytes the entries take up, as of the last scan of
+    #     the directory plus the entries put since, or None before the
+    #     first put. Entries put by other processes are only counted at the
+    #     next scan.
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024,
+                 version=CACHE_VERSION):
+        """Initialize a ResultCache in <directory>, creating it if needed.
+
+        @type self: ResultCache
+        @type directory: str
+        @type max_bytes: int
+        @type version: str
+        @rtype: None
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._total = None
+
+    def key(self, config, event_file):
+        """Return the key of a run of <event_file> under <config>.
+
+        @type self: ResultCache
+        @type config: str | StoreConfig
+            A configuration file name, or a configuration.
+        @type event_file: str
+        @rtype: str
+        """
+        if not isinstance(config, StoreConfig):
+            config = StoreConfig.load(config)
+        digest = hashlib.sha256()
+        digest.update(self.version.encode('utf-8') + b'\n')
+        digest.update(json.dumps(config.as_dict(), sort_keys=True).encode(
+            'utf-8') + b'\n')
+        digest.update(_event_hash(event_file).encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return the statistics saved under <key>, or None if there are
+        none.
+
+        @type self: ResultCache
+        @type key: str
+        @rtype: dict[str, object] | None
+        """
+        filename = os.path.join(self.directory, key + _SUFFIX)
+        try:
+            with open(filename, 'rb') as file:
+                stats = pickle.load(file)
+        except FileNotFoundError:
+            # never saved, or removed by another process
+            return None
+        except _CORRUPT_ERRORS:
+            stats = None
+        if not isinstance(stats, dict):
+            # a corrupt entry; remove it so the run is saved again
+            _remove(filename)
+            return None
+        try:
+            # mark the entry as recently used
+            os.utime(filename)
+        except FileNotFoundError:
+            # removed by another process since it was read
+            pass
+        return stats
+
+    def put(self, key, stats):
+        """Save <stats> under <key>, and remove the least recently used
+        entries if the cache is over its size limit.
+
+        @type self: ResultCache
+        @type key: str
+        @type stats: dict[str, object]
+        @rtype: None
+        """
+        if self._total is None:
+            self._evict()
+        filename = os.path.join(self.directory, key + _SUFFIX)
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory,
+                                                 suffix=_TEMPORARY_SUFFIX)
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                pickle.dump(stats, file, pickle.HIGHEST_PROTOCOL)
+                size = file.tell()
+            os.replace(temporary, filename)
+        except BaseException:
+            os.remove(temporary)
+            raise
+        self._total += size
+        # the directory is only scanned once the entries may be over the
+        # limit
+        if self._total > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        """Remove the least recently used entries until the entries take up
+        at most <max_bytes>, and note the size of the remaining entries.
+
+        Temporary files older than _STALE_TEMPORARY_AGE are removed too;
+        younger ones may still be being written, and are left alone.
+
+        @type self: ResultCache
+        @rtype: None
+        """
+        entries = []
+        total = 0
+        stale = time.time_ns() - _STALE_TEMPORARY_AGE * 10 ** 9
+        for entry in os.scandir(self.directory):
+            is_entry = entry.name.endswith(_SUFFIX)
+            if not is_entry and not entry.name.endswith(_TEMPORARY_SUFFIX):
+                continue
+            try:
+                status = entry.stat()
+            except FileNotFoundError:
+                continue
+            if is_entry:
+                entries.append((status.st_mtime_ns, entry.path,
+                                status.st_size))
+                total += status.st_size
+            elif status.st_mtime_ns < stale:
+                _remove(entry.path)
+        entries.sort()
+        for _, path, size in entries:
+            if total <= self.max_bytes:
+                break
+            _remove(path)
+            total -= size
+        self._total = total
+
+    def run(self, config, event_file, **options):
+        """Return the statistics of GroceryStoreSimulation(config).run(
+        event_file, **options), from the cache if they are in it.
+
+        @type self: ResultCache
+        @type config: str | StoreConfig
+        @type event_file: str
+        @rtype: dict[str, object]
+        """
+        key = self.key(config, event_file)
+        stats = self.get(key)
+        if stats is not None:
+            self.hits += 1
+            return stats
+        self.misses += 1
+        stats = GroceryStoreSimulation(config).run(event_file, **options)
+        self.put(key, stats)
+        return stats
+
+
+def _remove(filename):
+    """Remove the file <filename>, if it is still there.
+
+    @type filename: str
+    @rtype: None
+    """
+    try:
+        os.remove(filename)
+    except FileNotFoundError:
+        # another process removed it first
+        pass
@@ -0,0 +1,406 @@
+"""Real-Time Store Service
+
+This file contains StoreService, which runs a grocery store simulation on
+events that arrive while it runs, such as a live point-of-sale feed, and
+publishes rolling statistics about the store to any number of subscribers.
+
+Events are read in the format of a raw list of events, one per line, from
+standard input or from clients of a local socket. Statistics are written as
+one JSON object per line to standard output or to clients of another socket.
+
+Usage:
+    python service.py CONFIG [--listen HOST:PORT] [--publish HOST:PORT]
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import stat
+import sys
+from event import CloseLine, event_from_line
+from simulation import GroceryStoreSimulation
+from store import ZeroItemError
+
+# The number of bytes read from an event feed at once. Every complete line
+# read at once is parsed and processed together.
+READ_SIZE = 65536
+
+
+class StoreService:
+    """A grocery store simulation that is fed events while it runs.
+
+    The simulation clock is the timestamp of the last event processed. An
+    event fed to the service first makes every spawned event strictly before
+    it happen, then happens itself; events spawned at or after the clock wait
+    for a later event or for finish. So when the feed is sorted by timestamp,
+    events happen in the same order as in GroceryStoreSimulation.run.
+
+    An event fed with a timestamp before the clock still happens, at once,
+    and is counted as late. A line that is not an event, that closes a line
+    the store does not have, or that brings a customer with no items or
+    with no open line to join, is skipped and counted as bad.
+
+    Snapshots of the statistics are published every <interval> seconds. Each
+    subscriber has its own bounded queue of snapshots, and a subscriber that
+    falls behind loses its oldest snapshots instead of slowing down the
+    service.
+
+    === Attributes ===
+    @type clock: int | None
+        The timestamp of the last event processed, or None if no event has
+        been processed.
+    @type late_events: int
+        The number of events fed with a timestamp before the clock.
+    @type bad_lines: int
+        The number of lines fed that were skipped because they were not
+        events the store could take.
+    @type interval: float
+        The number of seconds between snapshots.
+    """
+    # === Private Attributes ===
+    # @type _simulation: GroceryStoreSimulation
+    #     The simulation whose store and queue of spawned events are used.
+    # @type _subscribers: set[asyncio.Queue]
+    #     The queue of snapshots of every subscriber.
+    # @type _history: collections.deque[WaitHistogram]
+    #     Copies of the store's wait times at the last snapshots, oldest
+    #     first. The recent wait times are the ones recorded since the oldest.
+
+    def __init__(self, store_file, interval=0.1, window=10):
+        """Initialize a StoreService with an empty store configured by
+        <store_file>.
+
+        @type self: StoreService
+        @type store_file: str
+        @type interval: float
+        @type window: int
+            The number of snapshots the recent wait times of a snapshot are
+            taken over.
+        @rtype: None
+        """
+        self._simulation = GroceryStoreSimulation(store_file)
+        self.clock = None
+        self.late_events = 0
+        self.bad_lines = 0
+        self.interval = interval
+        self._subscribers = set()
+        self._history = collections.deque(maxlen=window)
+        self._history.append(self._simulation._store.wait_times.copy())
+
+    def feed_lines(self, lines):
+        """Process the events in the raw event <lines>, in order.
+
+        @type self: StoreService
+        @type lines: list[str]
+        @rtype: None
+        """
+        num_lines = len(self._simulation._store.lines_served)
+        for line in lines:
+            try:
+                event = event_from_line(line)
+            except ValueError:
+                self.bad_lines += 1
+                continue
+            # blank lines have no event
+            if event is None:
+                continue
+            if isinstance(event, CloseLine) and \
+                    not 0 <= event.line < num_lines:
+                self.bad_lines += 1
+                continue
+            late = self.clock is not None and event.timestamp < self.clock
+            if not late:
+                self._advance(event.timestamp)
+            try:
+                self._process(event)
+            except (ZeroItemError, ValueError):
+                # a customer with no items, or with no open line to join;
+                # assign_line raises before the store is changed
+                self.bad_lines += 1
+                continue
+            if late:
+                self.late_events += 1
+
+    def finish(self):
+        """Process every spawned event that is still waiting.
+
+        @type self: StoreService
+        @rtype: None
+        """
+        events = self._simulation._events
+        while not events.is_empty():
+            self._process(events.remove())
+
+    def _advance(self, timestamp):
+        """Process every spawned event strictly before <timestamp>.
+
+        @type self: StoreService
+        @type timestamp: int
+        @rtype: None
+        """
+        events = self._simulation._events
+        while not events.is_empty() and events.peek().timestamp < timestamp:
+            self._process(events.remove())
+
+    def _process(self, event):
+        """Make <event> happen, and queue the events it spawns.
+
+        @type self: StoreService
+        @type event: Event
+        @rtype: None
+        """
+        for spawned in event.do(self._simulation._store):
+            self._simulation._events.add(spawned)
+        # a late event does not move the clock back
+        if self.clock is None or event.timestamp > self.clock:
+            self.clock = event.timestamp
+
+    def snapshot(self):
+        """Return the current statistics of the store, and start a new
+        snapshot period for the recent wait times.
+
+        @type self: StoreService
+        @rtype: dict[str, object]
+        """
+        store = self._simulation._store
+        recent = store.wait_times.since(self._history[0])
+        self._history.append(store.wait_times.copy())
+        return {
+            'clock': self.clock,
+            'num_customers': store.customer_count,
+            'max_wait': store.max_wait,
+            'late_events': self.late_events,
+            'bad_lines': self.bad_lines,
+            'queue_lengths': [store.find_cashier_line(i).curr_cap
+                              for i in range(len(store.lines_served))],
+            'lines_served': list(store.lines_served),
+            'recent_waits': recent.count,
+            'recent_p50_wait': recent.quantile(0.5),
+            'recent_p95_wait': recent.quantile(0.95),
+            'recent_p99_wait': recent.quantile(0.99)
+        }
+
+    def subscribe(self, size=16):
+        """Return a new queue that every later snapshot is put on.
+
+        Once <size> snapshots are waiting on the queue, the oldest one is
+        dropped for each new one.
+
+        @type self: StoreService
+        @type size: int
+        @rtype: asyncio.Queue
+        """
+        queue = asyncio.Queue(size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        """Stop putting snapshots on <queue>.
+
+        @type self: StoreService
+        @type queue: asyncio.Queue
+        @rtype: None
+        """
+        self._subscribers.discard(queue)
+
+    def publish(self):
+        """Put a snapshot on the queue of every subscriber, without waiting
+        for any of them.
+
+        @type self: StoreService
+        @rtype: None
+        """
+        stats = self.snapshot()
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(stats)
+
+    async def feed(self, reader):
+        """Process the events read from <reader> until it is exhausted.
+
+        Every complete line available is processed before the next read, so
+        under load events are parsed in large chunks, and between chunks the
+        other tasks, such as publishing, get to run.
+
+        @type self: StoreService
+        @type reader: asyncio.StreamReader | _FileReader
+        @rtype: None
+        """
+        partial = b''
+        while True:
+            data = await reader.read(READ_SIZE)
+            if len(data) == 0:
+                break
+            lines = (partial + data).split(b'\n')
+            # the last piece is not a complete line yet
+            partial = lines.pop()
+            # a line that is not valid UTF-8 is left for feed_lines to
+            # count as bad
+            self.feed_lines([line.decode('utf-8', 'replace') + '\n'
+                             for line in lines])
+            # let the other tasks run between chunks
+            await asyncio.sleep(0)
+        self.feed_lines([partial.decode('utf-8', 'replace') + '\n'])
+
+    async def publish_forever(self):
+        """Publish a snapshot every <interval> seconds, until cancelled.
+
+        @type self: StoreService
+        @rtype: None
+        """
+        while True:
+            await asyncio.sleep(self.interval)
+            self.publish()
+
+    async def send(self, writer, size=16):
+        """Write every later snapshot to <writer> as a line of JSON, until
+        the connection is lost or the task is cancelled.
+
+        @type self: StoreService
+        @type writer: asyncio.StreamWriter
+        @type size: int
+            The number of snapshots kept for a slow connection.
+        @rtype: None
+        """
+        queue = self.subscribe(size)
+        try:
+            while True:
+                stats = await queue.get()
+                writer.write(json.dumps(stats).encode('utf-8') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.unsubscribe(queue)
+            writer.close()
+
+
+def _address(text):
+    """Return the (host, port) written as HOST:PORT in <text>.
+
+    @type text: str
+    @rtype: (str, int)
+
+    >>> _address('127.0.0.1:8000')
+    ('127.0.0.1', 8000)
+    """
+    host, port = text.rsplit(':', 1)
+    return host, int(port)
+
+
+class _FileReader:
+    """A reader of a file the event loop cannot wait on, such as a regular
+    file, with the read method of asyncio.StreamReader. Each read runs in a
+    worker thread, so it does not block the event loop.
+    """
+    # === Private Attributes ===
+    # @type _file: io.BufferedReader
+    #     The file read from.
+
+    def __init__(self, file):
+        """Initialize a _FileReader of the binary <file>.
+
+        @type self: _FileReader
+        @type file: io.BufferedReader
+        @rtype: None
+        """
+        self._file = file
+
+    async def read(self, n):
+        """Return up to <n> bytes read from the file, or b'' at its end.
+
+        @type self: _FileReader
+        @type n: int
+        @rtype: bytes
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._file.read, n)
+
+
+async def _stdin_reader():
+    """Return a reader of standard input.
+
+    A pipe, socket or terminal is read through the event loop. Anything
+    else, such as a file redirected to standard input, is read in a worker
+    thread, since the event loop cannot wait on it.
+
+    @rtype: asyncio.StreamReader | _FileReader
+    """
+    mode = os.fstat(sys.stdin.fileno()).st_mode
+    if not (stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode) or
+            stat.S_ISCHR(mode)):
+        return _FileReader(sys.stdin.buffer)
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    return reader
+
+
+async def _print_snapshots(queue):
+    """Print every snapshot put on <queue> as a line of JSON.
+
+    @type queue: asyncio.Queue
+    @rtype: None
+    """
+    while True:
+        print(json.dumps(await queue.get()), flush=True)
+
+
+async def main(args):
+    """Run a StoreService as described by the command line <args>.
+
+    Reading from standard input stops at its end, once every spawned event
+    has happened and a last snapshot has been published. Listening on a
+    socket runs until interrupted.
+
+    @type args: argparse.Namespace
+    @rtype: None
+    """
+    service = StoreService(args.config, args.interval, args.window)
+    tasks = [asyncio.ensure_future(service.publish_forever())]
+    servers = []
+    try:
+        if args.publish is None:
+            tasks.append(asyncio.ensure_future(
+                _print_snapshots(service.subscribe())))
+        else:
+            servers.append(await asyncio.start_server(
+                lambda reader, writer: service.send(writer),
+                *_address(args.publish)))
+        if args.listen is None:
+            await service.feed(await _stdin_reader())
+            service.finish()
+            service.publish()
+            # let the subscribers take the last snapshot
+            await asyncio.sleep(service.interval)
+        else:
+            server = await asyncio.start_server(
+                lambda reader, writer: service.feed(reader),
+                *_address(args.listen))
+            servers.append(server)
+            await server.serve_forever()
+    finally:
+        for task in tasks:
+            task.cancel()
+        for server in servers:
+            server.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Run a grocery store simulation on live events.')
+    parser.add_argument('config', help='the store configuration file')
+    parser.add_argument('--listen', metavar='HOST:PORT',
+                        help='read events from clients of this address '
+                             'instead of standard input')
+    parser.add_argument('--publish', metavar='HOST:PORT',
+                        help='send statistics to clients of this address '
+                             'instead of standard output')
+    parser.add_argument('--interval', type=float, default=0.1,
+                        help='seconds between snapshots')
+    parser.add_argument('--window', type=int, default=10,
+                        help='snapshots the recent wait times cover')
+    asyncio.run(main(parser.parse_args()))
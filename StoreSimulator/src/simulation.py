@@ -5,9 +5,23 @@ kinds of events in the simulation.
 """
 # Feel free to add extra imports here for your own modules.
 # Just don't import any external libraries!
-from container import PriorityQueue
+# deque holds the batch of events that share a timestamp.
+from collections import deque
+from container import HeapPriorityQueue
 from store import GroceryStore
+from histogram import WaitHistogram
 from event import Event, create_event_list
+from event_stream import stream_events, read_records
+from closed_form import collect_events, run_closed_form
+from lane_engine import run_lanes
+from checkpoint import run_checkpointed
+
+# The ways GroceryStoreSimulation.run can process an event file.
+MODES = ['normal', 'streaming', 'batched', 'streaming_batched',
+         'checkpointed', 'closed_form', 'lanes']
+# The modes that do not pass every event through the simulation's loop, so
+# a profiler or trace cannot record them.
+_UNRECORDED_MODES = ['checkpointed', 'closed_form', 'lanes']
 
 
 class GroceryStoreSimulation:
@@ -27,31 +41,166 @@ class GroceryStoreSimulation:
     interface in any way!
     """
     # === Private Attributes ===
-    # @type _events: PriorityQueue[Event]
+    # @type _events: HeapPriorityQueue[Event]
     #     A sequence of events arranged in priority determined by the event
     #     sorting order.
     # @type _store: GroceryStore
     #     The grocery store associated with the simulation.
-    def __init__(self, store_file):
+    # @type _profiler: EventProfiler | None
+    #     The profiler recording the events of the simulation, if any.
+    # @type _trace: EventTrace | None
+    #     The trace recording the events of the simulation, if any.
+    def __init__(self, store_file, columnar=False, profiler=None,
+                 trace=None):
         """Initialize a GroceryStoreSimulation from a file.
 
-        @type store_file: str
-            A file containing the configuration of the grocery store.
+        @type store_file: str | StoreConfig
+            A file containing the configuration of the grocery store, or the
+            configuration itself, in which case no file is read.
+        @type columnar: bool
+            Whether the store keeps its customers in a columnar
+            CustomerTable instead of one object per customer.
+        @type profiler: EventProfiler | None
+            A profiler to record the time spent on each kind of event and in
+            each GroceryStore method. Without one, nothing is recorded.
+        @type trace: EventTrace | None
+            A trace to record a row for each event in. A simulation cannot
+            have both a profiler and a trace.
         @rtype: None
         """
-        self._events = PriorityQueue()
-        self._store = GroceryStore(store_file)
+        if profiler is not None and trace is not None:
+            raise ValueError('a simulation cannot have both a profiler and '
+                             'a trace')
+        self._events = HeapPriorityQueue()
+        self._store = GroceryStore(store_file, columnar)
+        self._profiler = profiler
+        if profiler is not None:
+            profiler.attach_store(self._store)
+        self._trace = trace
 
-    def run(self, event_file):
+    def run(self, event_file, mode='normal', checkpoint_file=None,
+            checkpoint_interval=100000):
         """Run the simulation on the events stored in <event_file>.
 
         Return a dictionary containing statistics of the simulation,
         according to the specifications in the assignment handout.
 
+        <mode> is one of MODES:
+            - 'normal': every event is read from <event_file> up front.
+            - 'streaming': events are read from <event_file> only when the
+              simulation reaches their timestamp, so memory use depends on
+              the number of events spawned and not on the length of the
+              file.
+            - 'batched': all the events that share a timestamp are processed
+              as one batch, and events spawned for that same timestamp are
+              kept in the batch instead of going through the PriorityQueue.
+            - 'streaming_batched': both of the above.
+            - 'checkpointed': the state of the simulation is saved to
+              <checkpoint_file> after every <checkpoint_interval> events,
+              and the simulation can be continued from there with
+              checkpoint.resume. Events are read lazily, as when streaming.
+            - 'closed_form': finish times are computed directly by
+              run_closed_form instead of through events.
+            - 'lanes': the events are run by run_lanes, which keeps one
+              pending checkout per line instead of one event per customer.
+
+        ValueError is raised for an unknown mode, if <checkpoint_file> is
+        not given exactly when <mode> is 'checkpointed', or if this
+        simulation has a profiler or trace and <mode> does not pass every
+        event through the simulation's loop.
+
+        In every mode the events are processed in the same order, so the
+        statistics are the same as for a normal run.
+
         @type self: GroceryStoreSimulation
         @type event_file: str
             A filename referring to a raw list of events.
             Precondition: the event file is a valid list of events.
+            If <mode> reads it lazily, the events in the file must also be
+            sorted by timestamp.
+        @type mode: str
+        @type checkpoint_file: str | None
+        @type checkpoint_interval: int
+        @rtype: dict[str, object]
+        """
+        self._check_mode(mode)
+        if (mode == 'checkpointed') != (checkpoint_file is not None):
+            raise ValueError('a checkpoint_file is given exactly for a '
+                             'checkpointed run')
+        if mode == 'closed_form':
+            return self._stats(run_closed_form(
+                self._store, *collect_events(read_records(event_file))))
+        if mode == 'lanes':
+            return self._stats(run_lanes(
+                self._store, *collect_events(read_records(event_file), True)))
+        if mode == 'checkpointed':
+            return run_checkpointed(self, event_file, checkpoint_file,
+                                    checkpoint_interval)
+        batched = mode in ['batched', 'streaming_batched']
+        if mode in ['streaming', 'streaming_batched']:
+            return self._run_events(stream_events(event_file), True, batched)
+        return self._run_events(create_event_list(event_file), False, batched)
+
+    def _check_mode(self, mode):
+        """Raise ValueError if <mode> is not one of MODES, or if this
+        simulation has a profiler or trace that could not record a run in
+        <mode>.
+
+        @type self: GroceryStoreSimulation
+        @type mode: str
+        @rtype: None
+        """
+        if mode not in MODES:
+            raise ValueError('unknown run mode: {!r}'.format(mode))
+        if mode in _UNRECORDED_MODES and (self._profiler is not None or
+                                          self._trace is not None):
+            raise ValueError('a profiled or traced simulation cannot make a '
+                             '{} run'.format(mode))
+
+    def _reset(self):
+        """Return this simulation to the state it was in when it was built,
+        so it can run another event file.
+
+        @type self: GroceryStoreSimulation
+        @rtype: None
+        """
+        self._events.clear()
+        self._store.reset()
+
+    def _run_events(self, initial_events, presorted=False, batched=False):
+        """Run the simulation on the Events in <initial_events>, and return
+        the statistics of the simulation as run does.
+
+        If <presorted> is True, <initial_events> must be sorted by timestamp,
+        and it is consumed lazily instead of being loaded into the queue.
+        The Events themselves are not changed, so the same list of Events can
+        be used for several simulations. If <batched> is True, events are
+        processed one timestamp at a time, as described in run.
+
+        @type self: GroceryStoreSimulation
+        @type initial_events: iterable[Event]
+        @type presorted: bool
+        @type batched: bool
+        @rtype: dict[str, object]
+        """
+        process = self._run_batches if batched else self._run_stream
+        if presorted:
+            last_event_timestamp = process(iter(initial_events))
+        else:
+            # load every initial event into the queue in one bulk pass
+            self._events.extend(initial_events)
+            last_event_timestamp = process(iter([]))
+        if self._trace is not None:
+            self._trace.flush()
+        return self._stats(last_event_timestamp)
+
+    def _stats(self, last_event_timestamp):
+        """Return the statistics of this simulation, once every event has
+        been processed.
+
+        @type self: GroceryStoreSimulation
+        @type last_event_timestamp: int | None
+            The timestamp of the last event processed.
         @rtype: dict[str, object]
         """
         # Initialize statistics
@@ -61,39 +210,224 @@ class GroceryStoreSimulation:
             'max_wait': -1
         }
 
-        initial_events = create_event_list(event_file)
-
-        # iterate through the list
-        for event in initial_events:
-            # add events to PriorityQueue
-            self._events.add(event)
-        # last_event_timestamp will represent the <total_time> attribute
-        last_event_timestamp = None
-        # while the PriorityQueue is not empty
-        while not self._events.is_empty():
-            # keep track of the event that's being removed from the front
-            event = self._events.remove()
-            # keep track of the events that are spawned
-            spawned_events = event.do(self._store)
-            # if spawned events is a non-empty list
-            if len(spawned_events) != 0:
-                # iterate through the list
-                for event in spawned_events:
-                    # add events to the PriorityQueue
-                    self._events.add(event)
-            # if the PriorityQueue is empty
-            if self._events.is_empty():
-                # set last_event_timestamp to reference the <timestamp> of
-                # the last event remove from the PriorityQueue
-                last_event_timestamp = event.timestamp
-
         # override stats values
         stats['num_customers'] = self._store.customer_count
         stats['total_time'] = last_event_timestamp
         stats['max_wait'] = self._store.max_wait
+        stats['lines_served'] = list(self._store.lines_served)
+        stats['wait_times'] = self._store.wait_times
+        _add_wait_stats(stats)
 
         return stats
 
+    def _run_stream(self, initial_events):
+        """Process events until both <initial_events> and the PriorityQueue
+        are exhausted, and return the timestamp of the last event processed.
+
+        <initial_events> must be sorted by timestamp. An initial event is
+        processed before any queued event with the same timestamp, which is
+        the order a bulk load of the same events would give.
+
+        @type self: GroceryStoreSimulation
+        @type initial_events: iterator[Event]
+        @rtype: int | None
+        """
+        profiler = self._profiler
+        trace = self._trace
+        # last_event_timestamp will represent the <total_time> attribute
+        last_event_timestamp = None
+        # the next initial event that has not been processed yet
+        pending = next(initial_events, None)
+        while pending is not None or not self._events.is_empty():
+            # take the initial event unless a queued event comes strictly
+            # before it
+            if pending is not None and (self._events.is_empty() or
+                                        not self._events.peek() < pending):
+                event = pending
+                pending = next(initial_events, None)
+            else:
+                event = self._events.remove()
+            if profiler is not None:
+                spawned_events = profiler.run_event(event, self._store)
+            else:
+                spawned_events = event.do(self._store)
+                if trace is not None:
+                    trace.record_event(event, spawned_events, self._store)
+            # add the events it spawns to the PriorityQueue
+            for spawned in spawned_events:
+                self._events.add(spawned)
+            last_event_timestamp = event.timestamp
+
+        return last_event_timestamp
+
+    def _run_checkpointed(self, initial_events, pending, last_event_timestamp,
+                          interval, save):
+        """Process events as _run_stream does, calling <save> after every
+        <interval> events, and return the timestamp of the last event
+        processed.
+
+        The initial events come with the byte offset just after their line in
+        the event file. <save> is called with the next unprocessed initial
+        event and its offset, or None if there are no more, and with the
+        timestamp of the last event processed. Those two values and the
+        PriorityQueue and GroceryStore of this simulation are all that is
+        needed to continue the simulation later.
+
+        @type self: GroceryStoreSimulation
+        @type initial_events: iterator[(Event, int)]
+            The initial events after <pending>, sorted by timestamp.
+        @type pending: (Event, int) | None
+            The next initial event and its offset.
+        @type last_event_timestamp: int | None
+        @type interval: int
+        @type save: ((Event, int) | None, int | None) -> None
+        @rtype: int | None
+        """
+        processed = 0
+        while pending is not None or not self._events.is_empty():
+            if pending is not None and (self._events.is_empty() or
+                                        not self._events.peek() < pending[0]):
+                event = pending[0]
+                pending = next(initial_events, None)
+            else:
+                event = self._events.remove()
+            for spawned in event.do(self._store):
+                self._events.add(spawned)
+            last_event_timestamp = event.timestamp
+            processed += 1
+            if processed == interval:
+                save(pending, last_event_timestamp)
+                processed = 0
+
+        return last_event_timestamp
+
+    def _run_batches(self, initial_events):
+        """Process events one timestamp at a time until both <initial_events>
+        and the PriorityQueue are exhausted, and return the timestamp of the
+        last event processed.
+
+        Each batch holds the initial events with the batch's timestamp, then
+        the queued events with that timestamp, then the events spawned for
+        that timestamp while the batch runs. This is the order _run_stream
+        processes them in.
+
+        @type self: GroceryStoreSimulation
+        @type initial_events: iterator[Event]
+            Events sorted by timestamp.
+        @rtype: int | None
+        """
+        profiler = self._profiler
+        trace = self._trace
+        last_event_timestamp = None
+        pending = next(initial_events, None)
+        batch = deque()
+        while pending is not None or not self._events.is_empty():
+            # the batch's timestamp is that of the event _run_stream would
+            # take next
+            if pending is not None and (self._events.is_empty() or
+                                        not self._events.peek() < pending):
+                now = pending.timestamp
+            else:
+                now = self._events.peek().timestamp
+            while pending is not None and pending.timestamp == now:
+                batch.append(pending)
+                pending = next(initial_events, None)
+            while not self._events.is_empty() and \
+                    self._events.peek().timestamp == now:
+                batch.append(self._events.remove())
+            while len(batch) > 0:
+                event = batch.popleft()
+                if profiler is not None:
+                    spawned_events = profiler.run_event(event, self._store)
+                else:
+                    spawned_events = event.do(self._store)
+                    if trace is not None:
+                        trace.record_event(event, spawned_events, self._store)
+                for spawned in spawned_events:
+                    # events for this timestamp stay in the batch
+                    if spawned.timestamp == now:
+                        batch.append(spawned)
+                    else:
+                        self._events.add(spawned)
+            last_event_timestamp = now
+
+        return last_event_timestamp
+
+
+def run_many(simulation, event_files, **options):
+    """Run <simulation> on each of the <event_files> in turn, starting from
+    an empty store each time, and return the statistics of each run.
+
+    The store and the PriorityQueue of <simulation> are reset between runs
+    instead of being built again. Every run gets the same <options>, the
+    keyword arguments of GroceryStoreSimulation.run, such as <mode>.
+
+    @type simulation: GroceryStoreSimulation
+    @type event_files: list[str]
+    @rtype: list[dict[str, object]]
+    """
+    all_stats = []
+    for event_file in event_files:
+        simulation._reset()
+        all_stats.append(simulation.run(event_file, **options))
+    return all_stats
+
+
+def _add_wait_stats(stats):
+    """Add the mean and quantile wait times and the per-line throughput to
+    <stats>, computed from its 'wait_times', 'lines_served' and 'total_time'.
+
+    @type stats: dict[str, object]
+    @rtype: None
+    """
+    wait_times = stats['wait_times']
+    stats['mean_wait'] = wait_times.mean()
+    stats['p50_wait'] = wait_times.quantile(0.5)
+    stats['p95_wait'] = wait_times.quantile(0.95)
+    stats['p99_wait'] = wait_times.quantile(0.99)
+    # customers served per unit of time at each line
+    if stats['total_time']:
+        stats['lines_throughput'] = [served / stats['total_time']
+                                     for served in stats['lines_served']]
+    else:
+        stats['lines_throughput'] = [0.0] * len(stats['lines_served'])
+
+
+def merge_stats(all_stats):
+    """Return the statistics of several simulation runs combined into one.
+
+    Customer counts, wait times and line counts are added together, and
+    'total_time' and 'max_wait' are the largest of the runs. Lines are matched
+    by index, so runs of differently sized stores give one entry per index.
+
+    @type all_stats: list[dict[str, object]]
+        Statistics returned by GroceryStoreSimulation.run.
+    @rtype: dict[str, object]
+    """
+    merged = {
+        'num_customers': 0,
+        'total_time': None,
+        'max_wait': -1,
+        'lines_served': [],
+        'wait_times': WaitHistogram()
+    }
+    for stats in all_stats:
+        merged['num_customers'] += stats['num_customers']
+        if stats['total_time'] is not None and (
+                merged['total_time'] is None or
+                stats['total_time'] > merged['total_time']):
+            merged['total_time'] = stats['total_time']
+        merged['max_wait'] = max(merged['max_wait'], stats['max_wait'])
+        served = merged['lines_served']
+        for i in range(len(stats['lines_served'])):
+            if i == len(served):
+                served.append(0)
+            served[i] += stats['lines_served'][i]
+        merged['wait_times'].merge(stats['wait_times'])
+    _add_wait_stats(merged)
+    return merged
+
+
 if __name__ == '__main__':
     sim = GroceryStoreSimulation('/Users/2707191/Desktop/Uni/2nd Y/1st Semester/CSC148H1 F/csc148/assignments/a1/config.json')
     stats = sim.run('/Users/2707191/Desktop/Uni/2nd Y/1st Semester/CSC148H1 F/csc148/assignments/a1/events.txt')
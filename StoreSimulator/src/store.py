@@ -5,6 +5,14 @@ in a grocery store.
 """
 # This module is used to read in the data from a json configuration file.
 import json
+# deque gives checkout lines O(1) removal from the front.
+from collections import deque
+# array and sys.intern are used by the columnar CustomerTable.
+from array import array
+import sys
+# os.stat tells StoreConfig.load whether a configuration file has changed.
+import os
+from histogram import WaitHistogram
 
 
 class GroceryStore:
@@ -17,6 +25,10 @@ class GroceryStore:
         Total number of customer that visited the store.
     @type max_wait: int
         The maximum amount of time a single customer waited in the store.
+    @type wait_times: WaitHistogram
+        The wait times of every customer that finished checking out.
+    @type lines_served: list[int]
+        The number of customers that finished checking out at each line.
     @type config: dict[str,int]
         A dictionary with information about the number of lines
         we should open in the grocery store and the maximum number of customers
@@ -27,108 +39,158 @@ class GroceryStore:
     #    A list representing all the checkout lines in the store. List contains
     #    the specified amount of StandardCheckout, ExpressCheckout and SelfCheckout
     #    objects.
-    #
+    # @type _customer_index: dict[str, (int, Customer)] | dict[str, int]
+    #    Maps the <cid> of every customer currently in a line to the index of
+    #    that line and the Customer, or, if the store is columnar, to the id
+    #    of the customer's row, which holds the index of the line.
+    # @type _customer_table: CustomerTable | None
+    #    The table holding the customers' data if the store is columnar, or
+    #    None if each customer is a Customer object.
+    # @type _config: StoreConfig
+    #    The configuration the store was built from.
+    # @type _line_loads: LineLoadIndex
+    #    The <curr_cap> of every line a customer with less than 8 items can
+    #    join.
+    # @type _large_line_loads: LineLoadIndex
+    #    The <curr_cap> of every line a customer with 8 or more items can
+    #    join.
 
     # === Representation invariants ===
     # Each item in the list _cashiers must be a type of checkout line
     # There is always at least one open line that has space for a customer
+    # _customer_index has exactly one entry for each customer in a line
+    # If _customer_table is None, each line holds Customer objects in a
+    # deque; otherwise it holds the ids of rows in _customer_table in a
+    # RowQueue
+    # _line_loads and _large_line_loads agree with the <curr_cap> and <open>
+    # attributes of every line
+    # The <curr_cap> of a line is the number of customers in its _customers,
+    # plus the number of places held in it by hold_places
 
-    def __init__(self, filename):
-        """Initializes a GroceryStore from a configuration file <filename>.
+    def __init__(self, config, columnar=False):
+        """Initializes a GroceryStore from <config>, either a StoreConfig or
+        the name of a configuration file.
+
+        If <columnar> is True, the customers' data is kept in a CustomerTable
+        instead of one Customer object per customer. Every method behaves the
+        same way with either backend.
 
         @type self: GroceryStore
-        @type filename: str
-            The name of the file containing the configuration for the
-            grocery store.
+        @type config: str | StoreConfig
+            The configuration for the grocery store, or the name of the file
+            containing it.
+        @type columnar: bool
         @rtype: None
         """
         self._cashiers = []
+        self._customer_index = {}
+        self._customer_table = CustomerTable() if columnar else None
         self.customer_count = 0
         self.max_wait = 0
+        self.wait_times = WaitHistogram()
 
-        with open(filename, 'r') as file:
-            self.config = json.load(file)
+        if not isinstance(config, StoreConfig):
+            config = StoreConfig.load(config)
         # <config> is now a dictionary with the keys 'cashier_count',
         # 'express_count', 'self_serve_count', and 'line_capacity'.
-        # create instances of StandardCheckout class according to 'cashier_count
-        # and 'line_capacity' from <config>
-        i = 0
-        while i < self.config['cashier_count']:
-            self._cashiers.append(
-                StandardCheckout(self.config['line_capacity']))
-            i += 1
-        # create instances of ExpressCheckout class according to 'cashier_count'
-        # and 'line_capacity' from <config>
-        i = 0
-        while i < self.config['express_count']:
-            self._cashiers.append(ExpressCheckout(self.config['line_capacity']))
-            i += 1
-        # create instances of SelfCheckout class according to 'cashier_count'
-        # and 'line_capacity' from <config>
-        i = 0
-        while i < self.config['self_serve_count']:
-            self._cashiers.append(SelfCheckout(self.config['line_capacity']))
-            i += 1
+        self._config = config
+        self.config = config.as_dict()
+        # create the StandardCheckout, ExpressCheckout and SelfCheckout lines,
+        # in that order, according to <config>
+        self._cashiers = config.new_lines()
+        if columnar:
+            for line in self._cashiers:
+                line._customers = RowQueue()
+
+        self.lines_served = [0] * len(self._cashiers)
+        if config._loads is None:
+            self._line_loads = LineLoadIndex(len(self._cashiers))
+            self._large_line_loads = LineLoadIndex(len(self._cashiers))
+            for line_index in range(len(self._cashiers)):
+                self._update_line_load(line_index)
+            # every store with this config starts with the same loads
+            config._loads = (self._line_loads.copy(),
+                             self._large_line_loads.copy())
+        else:
+            self._line_loads = config._loads[0].copy()
+            self._large_line_loads = config._loads[1].copy()
+
+    def reset(self):
+        """ Return this store to the state it was in when it was built, with
+        every line open and empty and no statistics recorded.
+
+        The lines, indexes and customer table are emptied in place and
+        reused, so this takes time in the number of lines and of customers
+        still in them. The old WaitHistogram is left to any statistics that
+        hold it, and a new one is started.
+
+        @type self: GroceryStore
+        @rtype: None
+        """
+        for line_index in range(len(self._cashiers)):
+            line = self._cashiers[line_index]
+            # free the rows of the customers still in the line
+            if self._customer_table is not None:
+                for row in line._customers:
+                    self._customer_table.release(row)
+            line._customers.clear()
+            line.curr_cap = 0
+            line.open = True
+            self.lines_served[line_index] = 0
+        self._customer_index.clear()
+        self.customer_count = 0
+        self.max_wait = 0
+        self.wait_times = WaitHistogram()
+        self._line_loads.copy_from(self._config._loads[0])
+        self._large_line_loads.copy_from(self._config._loads[1])
 
     def assign_line(self, customer):
         """ Return the line index that a given customer should join.
 
+        A customer joins the open line with the fewest customers, and the
+        line with the lowest index among those. Customers with 8 or more
+        items cannot join an ExpressCheckout line or a full line.
+
         @type self: GroceryStore
         @type customer: Customer
             The customer is of type Customer.
-        @rtype: int
+        @rtype: int | None
             Represents the index of the line in list _cashiers that the
-            given customer should join.
+            given customer should join, or None if no line is available.
         """
         if not customer.num_items > 0:
             raise ZeroItemError
+        # check if <customer> has less than 8 items
+        elif customer.num_items < 8:
+            return self._line_loads.least_loaded()
+        # customer has 8 or more items
         else:
-            # line_index represents the best line for <customer>
-            line_index = None
-            # check if <customer> has less than 8 items
-            if customer.num_items < 8:
-                # iterate through the list of cashiers
-                for line in self._cashiers:
-                    # check if a line is available
-                    if line.open and line.curr_cap <= line.max_cap:
-                        # if it's the first line we're checking
-                        if line_index is None:
-                            # update line_index
-                            line_index = self._cashiers.index(line)
-                        else:
-                            # we compare the iterated line with the line at
-                            # line_index
-                            # current_cap represents the amount of customers
-                            # in the line at line_index
-                            current_cap = self._cashiers[line_index].curr_cap
-                            # if capacities are the same
-                            if line.curr_cap == current_cap:
-                                # compare indices
-                                # if the iterated line has a lower index
-                                if self._cashiers.index(line) < line_index:
-                                    # its index becomes line_index
-                                    line_index = self._cashiers.index(line)
-                            # if a iterated line has a lower capacity than
-                            # current_cap
-                            elif line.curr_cap < current_cap:
-                                # its index becomes line_index
-                                line_index = self._cashiers.index(line)
-            # customer has 8 or more items
-            else:
-                for line in self._cashiers:
-                    # customer cannot join an ExpressCheckout line
-                    if line.open and line.curr_cap != line.max_cap and \
-                                    type(line) != ExpressCheckout:
-                        if line_index is None:
-                            line_index = self._cashiers.index(line)
-                        else:
-                            current_cap = self._cashiers[line_index].curr_cap
-                            if line.curr_cap == current_cap:
-                                if self._cashiers.index(line) < line_index:
-                                    line_index = self._cashiers.index(line)
-                            elif line.curr_cap < current_cap:
-                                line_index = self._cashiers.index(line)
-        return line_index
+            return self._large_line_loads.least_loaded()
+
+    def _update_line_load(self, line_index):
+        """ Record the current state of the line at <line_index> in the line
+        load indexes. Must be called whenever the <curr_cap> or <open>
+        attribute of a line changes.
+
+        @type self: GroceryStore
+        @type line_index: int
+            The index of the checkout line.
+        @rtype: None
+        """
+        line = self._cashiers[line_index]
+        # a customer with less than 8 items can join any open line that is
+        # not over capacity
+        if line.open and line.curr_cap <= line.max_cap:
+            self._line_loads.update(line_index, line.curr_cap)
+        else:
+            self._line_loads.update(line_index, None)
+        # a customer with 8 or more items cannot join an ExpressCheckout line
+        # or a line that is exactly full
+        if line.open and line.curr_cap != line.max_cap and \
+                type(line) != ExpressCheckout:
+            self._large_line_loads.update(line_index, line.curr_cap)
+        else:
+            self._large_line_loads.update(line_index, None)
 
     def is_empty(self, line_index):
         """ Return True iff the line is empty.
@@ -153,60 +215,64 @@ class GroceryStore:
             is calculated using the assign_line method.
         @rtype: None
         """
-        # if the line at the given index is empty
-        if self.is_empty(line_index):
-            # find line at <line_index>
-            line = self._cashiers[line_index]
-            # initialize an instance of customer with <cid> and <num_items>
-            # add customer to the specified line
-            line._customers.append(Customer(cid, num_items))
-        # if the line is not empty
+        # find line at <line_index>
+        line = self._cashiers[line_index]
+        table = self._customer_table
+        if table is None:
+            # initialize a customer with <cid> and <num_items>
+            customer = Customer(cid, num_items)
+            # if the line is not empty, update the <next> attribute of the
+            # last customer at specified line to point to the <cid> of the
+            # customer we are adding
+            if len(line._customers) > 0:
+                line._customers[-1].next = cid
+            # record where the customer is so it can be found directly
+            self._customer_index[cid] = (line_index, customer)
         else:
-            # find line at <line_index>
-            line = self._cashiers[line_index]
-            # update the <next> attribute of the last customer at specified line
-            # to point to the <cid> of the customer we are adding
-            line._customers[-1].next = cid
-            # add the customer to the specified line
-            line._customers.append(Customer(cid, num_items))
+            # the customer's row records the line they are in
+            customer = table.add(cid, num_items, line_index)
+            if len(line._customers) > 0:
+                table.nexts[line._customers[-1]] = cid
+            self._customer_index[cid] = customer
+        # add the customer to the specified line
+        line._customers.append(customer)
         # increment the customer_count of the store by 1
         self.customer_count += 1
-        # increment the <customer_count> of the GroceryStore by 1
-        line.curr_cap += 1
         # increment the <curr_cap> of the specified line by 1
+        line.curr_cap += 1
+        self._update_line_load(line_index)
 
     def find_customer(self, cid):
         """ Returns the Customer object using the <cid> attribute.
 
         @type cid: str
             The unique str id of the customer.
-        @rtype: Customer
-            The actual Customer object the <cid> references.
+        @rtype: Customer | CustomerRow | None
+            The customer the <cid> references, or None if no customer in a
+            line has that <cid>.
         """
-        # iterate through cashiers
-        for cashier in self._cashiers:
-            # iterate through customers
-            for customer in cashier._customers:
-                # if the name of the customer matches <cid>
-                if cid == customer.cid:
-                    return customer
+        entry = self._customer_index.get(cid)
+        if entry is None:
+            return None
+        if self._customer_table is None:
+            return entry[1]
+        return CustomerRow(self._customer_table, entry)
 
     def find_cashier_line_index(self, cid):
         """ Return the index of the line the customer is currently in.
 
         @type cid: str
             The unique str id of the customer.
-        @rtype: int
-            The index of the line the customer is currently in.
+        @rtype: int | None
+            The index of the line the customer is currently in, or None if no
+            customer in a line has that <cid>.
         """
-        # iterate through cashiers
-        for i in range(len(self._cashiers)):
-            # iterate through customers
-            for customer in self._cashiers[i]._customers:
-                # if customer name matches <cid>
-                if cid == customer.cid:
-                    # return index
-                    return i
+        entry = self._customer_index.get(cid)
+        if entry is None:
+            return None
+        if self._customer_table is None:
+            return entry[0]
+        return self._customer_table.lines[entry]
 
     def find_cashier_line(self, index):
         """Returns the Cashier object in GroceryStore with the given index.
@@ -218,6 +284,32 @@ class GroceryStore:
         """
         return self._cashiers[index]
 
+    def front_customer(self, line_index):
+        """ Return the customer at the front of the line specified by
+        <line_index>.
+
+        @type line_index: int
+            The index of the checkout line.
+            Precondition: the line is not empty.
+        @rtype: Customer | CustomerRow
+        """
+        return self._customer(self._cashiers[line_index]._customers[0])
+
+    def _customer(self, entry):
+        """ Return the customer for an entry of a line's <_customers>.
+
+        With the object backend the entry is already a Customer. With the
+        columnar backend it is a row id, and a CustomerRow view of that row
+        is returned.
+
+        @type self: GroceryStore
+        @type entry: Customer | int
+        @rtype: Customer | CustomerRow
+        """
+        if self._customer_table is None:
+            return entry
+        return CustomerRow(self._customer_table, entry)
+
     def remove_customer_front(self, line_index):
         """ Removes the customer at the front of the line specified by <line_index>.
 
@@ -225,11 +317,20 @@ class GroceryStore:
             The index of the checkout line.
         @return: None
         """
-        # find the customer at the front of the line at <line_index>
-        customer = self._cashiers[line_index]._customers[0]
+        # find the line from which we are removing the customer
+        line = self._cashiers[line_index]
+        # remove the customer at the front from <_customers> of the line
+        entry = line._customers.popleft()
+        table = self._customer_table
         # calculate the customer's wait time using his <finish_time> and
         # <join_time> attributes
-        wait_time = customer.finish_time - customer.join_time
+        if table is None:
+            wait_time = entry.finish_time - entry.join_time
+            del self._customer_index[entry.cid]
+        else:
+            wait_time = table.finish_times[entry] - table.join_times[entry]
+            del self._customer_index[table.cids[entry]]
+            table.release(entry)
         # if the customer is the first to finish checkout
         if self.max_wait == 0:
             # his/her wait_time becomes max_wait
@@ -240,12 +341,11 @@ class GroceryStore:
             if self.max_wait < wait_time:
                 # max_wait becomes customer's wait_time
                 self.max_wait = wait_time
-        # find the line from which we are removing the customer
-        line = self._cashiers[line_index]
-        # remove customer from <_customers> list of the specified line
-        line._customers.remove(line._customers[0])
+        self.wait_times.record(wait_time)
+        self.lines_served[line_index] += 1
         # subtract 1 from the <curr_cap> of the specified line
         line.curr_cap -= 1
+        self._update_line_load(line_index)
 
     def remove_customer_back(self, line_index):
         """ Removes the customer from the back of the line specified by <line_index>.
@@ -257,37 +357,127 @@ class GroceryStore:
         # find the line at <line_index>
         line = self._cashiers[line_index]
         # remove the customer at the end of the specified line
-        line._customers.pop()
+        entry = line._customers.pop()
+        del self._customer_index[self._customer(entry).cid]
+        if self._customer_table is not None:
+            self._customer_table.release(entry)
         # set the <next> attribute of the last person to point to None
-        line._customers[-1].next = None
+        self._customer(line._customers[-1]).next = None
         # subtract 1 from the <curr_cap> of the specified line
         line.curr_cap -= 1
+        self._update_line_load(line_index)
         # subtract 1 from the <customer_count> attribute of GroceryStore
         self.customer_count -= 1
 
     def close_c(self, line_index):
-        """ Close the checkout line specified by the <line_index>.
+        """ Close the checkout line specified by the <line_index>, and return
+        the customers who have to leave it: everyone but the customer at the
+        front, starting from the back of the line.
+
+        The customers are taken off the line together, and the counters,
+        links and line load are updated once for all of them.
 
         @type line_index: int
             The index of the checkout line.
-        @return: None
+        @rtype: list[Customer]
         """
-        # list_customers is list of customer that needs to be sent to a new line
-        list_customers = []
         # find line at <line_index>
         line = self._cashiers[line_index]
-        # change the line attribute <open> to False
+        # change the line attribute <open> to False, which also takes the
+        # line out of the line load indexes
         line.open = False
-        # iterate through the list of customers until only 1 customer remains
-        while len(line._customers) > 1:
-            # find the last customer
-            last_customer = line._customers[-1]
-            # add the last customer to list_customers
-            list_customers.append(last_customer)
-            # remove the last customer from the line
-            self.remove_customer_back(line_index)
+        self._update_line_load(line_index)
+        # only the customer at the front stays
+        if len(line._customers) <= 1:
+            return []
+        # split the front customer off the rest of the queue: the line keeps
+        # a new queue holding only the front, and the old one leaves whole
+        front = line._customers.popleft()
+        tail = line._customers
+        line._customers = type(tail)()
+        line._customers.append(front)
+        # list_customers is the list of customers that need to be sent to a
+        # new line, from the back, as Customer objects that stay valid after
+        # they leave
+        table = self._customer_table
+        if table is None:
+            list_customers = list(reversed(tail))
+            for customer in list_customers:
+                del self._customer_index[customer.cid]
+        else:
+            list_customers = []
+            for row in reversed(tail):
+                del self._customer_index[table.cids[row]]
+                list_customers.append(table.detach(row))
+                table.release(row)
+        # the customer at the front is now the last one in the line
+        self._customer(front).next = None
+        line.curr_cap -= len(list_customers)
+        self.customer_count -= len(list_customers)
         return list_customers
 
+    def readmit(self, customers):
+        """ Add each of <customers> to the line assign_line picks for them,
+        in order, keeping their join times, and return the index of each
+        line, or None for a customer no line had room for.
+
+        This puts the customers close_c takes off a closed line back in the
+        store, as their arrivals would in the event loop.
+
+        @type customers: list[Customer]
+        @rtype: list[int | None]
+        """
+        line_indexes = []
+        for customer in customers:
+            line_index = self.assign_line(customer)
+            if line_index is not None:
+                self.add_customer(customer.cid, customer.num_items,
+                                  line_index)
+                if customer.join_time is not None:
+                    self.set_join_time(self.find_customer(customer.cid),
+                                       customer.join_time)
+            line_indexes.append(line_index)
+        return line_indexes
+
+    def hold_places(self, line_index, count):
+        """ Count <count> more customers in the line specified by
+        <line_index>, or fewer if <count> is negative, without adding any
+        customer to it or taking any out.
+
+        This lets a run that tracks its customers itself, as run_closed_form
+        does, have assign_line see its lines as full as they are.
+
+        @type line_index: int
+            The index of the checkout line.
+        @type count: int
+            Precondition: the line holds at least -<count> places.
+        @rtype: None
+        """
+        self._cashiers[line_index].curr_cap += count
+        self._update_line_load(line_index)
+
+    def record_finish(self, line_index, wait_time):
+        """ Record that a customer held a place in the line specified by
+        <line_index> with hold_places finished checking out after waiting
+        <wait_time>, and give up their place.
+
+        The wait statistics are updated as remove_customer_front updates
+        them, and the customer is counted in <customer_count>, as
+        add_customer would have counted them.
+
+        @type line_index: int
+            The index of the checkout line.
+            Precondition: the line holds at least one place.
+        @type wait_time: int
+        @rtype: None
+        """
+        if self.max_wait < wait_time:
+            self.max_wait = wait_time
+        self.wait_times.record(wait_time)
+        self.lines_served[line_index] += 1
+        self.customer_count += 1
+        self.hold_places(line_index, -1)
+
     def process_c(self, line_index):
         """ Return the time it takes for the cashier to process the customer at
         the front of the line specified by <line_index>.
@@ -298,21 +488,37 @@ class GroceryStore:
             The value representing the processing time of the customer
             at the front of the line.
         """
+        # find the line object at <line_index>
+        line = self._cashiers[line_index]
+        # find the number of items of the customer at the front
+        num_items = self._customer(line._customers[0]).num_items
+        return self.process_time(line_index, num_items)
+
+    def process_time(self, line_index, num_items):
+        """ Return the time it takes for the cashier of the line specified by
+        <line_index> to process a customer with <num_items> items.
+
+        @type line_index: int
+            The index of the checkout line.
+        @type num_items: int
+            The number of items the customer is carrying.
+        @rtype: int
+        """
         processing_time = None
         # find the line object at <line_index>
         line = self._cashiers[line_index]
         # if line is of type StandardCheckout
         if type(line) == StandardCheckout:
             # update processing_time
-            processing_time = line._customers[0].num_items + 7
+            processing_time = num_items + 7
         # if line is of type ExpressCheckout
         elif type(line) == ExpressCheckout:
             # update processing_time
-            processing_time = line._customers[0].num_items + 4
+            processing_time = num_items + 4
         # if line is of type SelfCheckout
         elif type(line) == SelfCheckout:
             # update processing_time
-            processing_time = 2 * (line._customers[0].num_items) + 1
+            processing_time = 2 * num_items + 1
         return processing_time
 
     def set_join_time(self, customer, timestamp):
@@ -320,7 +526,7 @@ class GroceryStore:
         not be called on a <customer> that has an already modified <join_time>
         attribute.
 
-        @type customer: Customer
+        @type customer: Customer | CustomerRow
         @type timestamp: int
             The time customer joined the line.
         @rtype: None
@@ -335,7 +541,7 @@ class GroceryStore:
         Should not be called on a <customer> that has an already modified
         <finish_time> attribute.
 
-        @type customer: Customer
+        @type customer: Customer | CustomerRow
         @type timestamp: int
             The time customer finished checking out.
         @rtype: None
@@ -346,6 +552,240 @@ class GroceryStore:
             customer.finish_time = timestamp
 
 
+class StoreConfig:
+    """ A validated configuration for a grocery store.
+
+    A StoreConfig is checked once when it is created, and every store built
+    from it reuses its layout of lines, so building many stores from one
+    configuration does not read or check it again.
+
+    === Attributes ===
+    @type cashier_count: int
+        The number of StandardCheckout lines.
+    @type express_count: int
+        The number of ExpressCheckout lines.
+    @type self_serve_count: int
+        The number of SelfCheckout lines.
+    @type line_capacity: int
+        The maximum number of customers in each line.
+
+    >>> config = StoreConfig(2, 1, 0, 5)
+    >>> [type(line).__name__ for line in config.new_lines()]
+    ['StandardCheckout', 'StandardCheckout', 'ExpressCheckout']
+    >>> StoreConfig(1, 0, 0, 0)
+    Traceback (most recent call last):
+    ...
+    ValueError: line_capacity must be at least 1, not 0
+    """
+    # === Private attributes ===
+    # @type _layout: list[type]
+    #    The class of each line, in order.
+    # @type _loads: (LineLoadIndex, LineLoadIndex) | None
+    #    The line load indexes of a new GroceryStore with this configuration,
+    #    kept by the first such GroceryStore to be copied by the others, or
+    #    None if there has not been one yet.
+
+    # The keys of a configuration dictionary.
+    KEYS = ['cashier_count', 'express_count', 'self_serve_count',
+            'line_capacity']
+
+    def __init__(self, cashier_count, express_count, self_serve_count,
+                 line_capacity):
+        """ Initializes a StoreConfig, raising ValueError if it does not
+        describe a store that can serve customers.
+
+        @type self: StoreConfig
+        @type cashier_count: int
+        @type express_count: int
+        @type self_serve_count: int
+        @type line_capacity: int
+        @rtype: None
+        """
+        values = [cashier_count, express_count, self_serve_count,
+                  line_capacity]
+        for key, value in zip(StoreConfig.KEYS, values):
+            # bool is a subclass of int, but is not a count
+            if type(value) != int:
+                raise ValueError('{} must be an integer, not {!r}'.format(
+                    key, value))
+            if value < 0:
+                raise ValueError('{} must not be negative, not {}'.format(
+                    key, value))
+        if line_capacity < 1:
+            raise ValueError('line_capacity must be at least 1, not {}'.format(
+                line_capacity))
+        if cashier_count + express_count + self_serve_count == 0:
+            raise ValueError('a store needs at least one line')
+        self.cashier_count = cashier_count
+        self.express_count = express_count
+        self.self_serve_count = self_serve_count
+        self.line_capacity = line_capacity
+        self._layout = ([StandardCheckout] * cashier_count +
+                        [ExpressCheckout] * express_count +
+                        [SelfCheckout] * self_serve_count)
+        self._loads = None
+
+    @staticmethod
+    def from_dict(config):
+        """ Return the StoreConfig for the configuration dictionary <config>,
+        raising ValueError if it is not valid.
+
+        @type config: dict[str, int]
+        @rtype: StoreConfig
+        """
+        missing = [key for key in StoreConfig.KEYS if key not in config]
+        if len(missing) > 0:
+            raise ValueError('missing configuration keys: {}'.format(
+                ', '.join(missing)))
+        return StoreConfig(*[config[key] for key in StoreConfig.KEYS])
+
+    @staticmethod
+    def load(filename):
+        """ Return the StoreConfig in the configuration file <filename>.
+
+        The file is only read again if it has changed since the last call.
+
+        @type filename: str
+        @rtype: StoreConfig
+        """
+        status = os.stat(filename)
+        path = os.path.abspath(filename)
+        version = (status.st_mtime_ns, status.st_size)
+        cached = _loaded_configs.get(path)
+        if cached is None or cached[0] != version:
+            with open(filename, 'r') as file:
+                cached = (version, StoreConfig.from_dict(json.load(file)))
+            _loaded_configs[path] = cached
+        return cached[1]
+
+    def as_dict(self):
+        """ Return this configuration as a configuration dictionary.
+
+        @type self: StoreConfig
+        @rtype: dict[str, int]
+        """
+        return {key: getattr(self, key) for key in StoreConfig.KEYS}
+
+    def new_lines(self):
+        """ Return a new, empty and open line for each line of this
+        configuration.
+
+        @type self: StoreConfig
+        @rtype: list[StandardCheckout | ExpressCheckout | SelfCheckout]
+        """
+        capacity = self.line_capacity
+        return [kind(capacity) for kind in self._layout]
+
+
+# The StoreConfig of each configuration file loaded, by absolute path, with
+# the modification time and size of the file when it was read.
+_loaded_configs = {}
+
+
+class LineLoadIndex:
+    """ An index of checkout line loads that finds the least loaded line.
+
+    Each line either has a load, or is left out of the index. The least
+    loaded line is the one with the smallest load, and the one with the
+    lowest index among those. Updating a line takes O(log n) time and finding
+    the least loaded line takes O(1) time, where n is the number of lines.
+
+    >>> loads = LineLoadIndex(3)
+    >>> loads.least_loaded() is None
+    True
+    >>> loads.update(0, 2)
+    >>> loads.update(1, 1)
+    >>> loads.update(2, 1)
+    >>> loads.least_loaded()
+    1
+    >>> loads.update(1, None)
+    >>> loads.least_loaded()
+    2
+    """
+    # === Private attributes ===
+    # @type _size: int
+    #    The number of lines in the index.
+    # @type _tree: list[int | float]
+    #    A segment tree stored in a list. Leaf _size + i holds the key of line
+    #    i, and every node i below _size holds the smaller of the keys at
+    #    nodes 2 * i and 2 * i + 1, so node 1 holds the smallest key.
+    #    The key of a line with load c and index i is c * _size + i, so keys
+    #    order lines by load and then by index. Lines left out of the index
+    #    have the key infinity.
+
+    def __init__(self, size):
+        """ Initializes a LineLoadIndex of <size> lines, none of which are in
+        the index.
+
+        @type self: LineLoadIndex
+        @type size: int
+            The number of lines.
+        @rtype: None
+        """
+        self._size = size
+        self._tree = [float('inf')] * (2 * size)
+
+    def update(self, line_index, load):
+        """ Set the load of the line at <line_index> to <load>, or leave the
+        line out of the index if <load> is None.
+
+        @type self: LineLoadIndex
+        @type line_index: int
+        @type load: int | None
+            A load that is not negative, or None.
+        @rtype: None
+        """
+        tree = self._tree
+        if load is None:
+            key = float('inf')
+        else:
+            key = load * self._size + line_index
+        i = line_index + self._size
+        tree[i] = key
+        i //= 2
+        # recompute the ancestors of the leaf, stopping early once one of
+        # them is unchanged since the ones above it are then unchanged too
+        while i >= 1:
+            smallest = min(tree[2 * i], tree[2 * i + 1])
+            if tree[i] == smallest:
+                break
+            tree[i] = smallest
+            i //= 2
+
+    def copy(self):
+        """ Return a new LineLoadIndex with the same lines and loads.
+
+        @type self: LineLoadIndex
+        @rtype: LineLoadIndex
+        """
+        copy = LineLoadIndex(0)
+        copy._size = self._size
+        copy._tree = list(self._tree)
+        return copy
+
+    def copy_from(self, other):
+        """ Give every line of this LineLoadIndex the load it has in <other>,
+        reusing the memory of this LineLoadIndex.
+
+        @type self: LineLoadIndex
+        @type other: LineLoadIndex
+            An index of the same number of lines.
+        @rtype: None
+        """
+        self._tree[:] = other._tree
+
+    def least_loaded(self):
+        """ Return the index of the least loaded line, or None if no line is
+        in the index.
+
+        @type self: LineLoadIndex
+        @rtype: int | None
+        """
+        if self._size == 0 or self._tree[1] == float('inf'):
+            return None
+        return self._tree[1] % self._size
+
+
 class StandardCheckout:
     """ A standard checkout line.
 
@@ -358,8 +798,9 @@ class StandardCheckout:
         Whether or not the line is available for customers to join.
     """
     # === Private attributes ===
-    # @type _customers : list[Customer]
-    #    This list keeps track of the customers currently present at the line.
+    # @type _customers: deque[Customer]
+    #    This deque keeps track of the customers currently present at the line.
+    __slots__ = ('_customers', 'max_cap', 'curr_cap', 'open')
 
     def __init__(self, max_cap):
         """ Initializes a StandardCheckout line.
@@ -384,7 +825,7 @@ class StandardCheckout:
         True
         """
 
-        self._customers = []
+        self._customers = deque()
         self.max_cap = max_cap
         self.curr_cap = 0
         self.open = True
@@ -402,8 +843,9 @@ class ExpressCheckout:
         Whether or not the line is available for customers to join.
     """
     # === Private attributes ===
-    # @type _customers: list[Customer]
-    #    This list keeps track of the customers currently present at the line.
+    # @type _customers: deque[Customer]
+    #    This deque keeps track of the customers currently present at the line.
+    __slots__ = ('_customers', 'max_cap', 'curr_cap', 'open')
 
     def __init__(self, max_cap):
         """ Initializes an ExpressCheckout line.
@@ -427,7 +869,7 @@ class ExpressCheckout:
         >>> c.open
         True
         """
-        self._customers = []
+        self._customers = deque()
         self.max_cap = max_cap
         self.curr_cap = 0
         self.open = True
@@ -445,8 +887,9 @@ class SelfCheckout:
         Whether or not the line is available for customers to join.
     """
     # === Private attributes ===
-    # @type _customers: list[Customer]
-    #    This list keeps track of the customers currently present at the line.
+    # @type _customers: deque[Customer]
+    #    This deque keeps track of the customers currently present at the line.
+    __slots__ = ('_customers', 'max_cap', 'curr_cap', 'open')
 
     def __init__(self, max_cap):
         """ Initializes a SelfCheckout line.
@@ -470,7 +913,7 @@ class SelfCheckout:
         >>> c.open
         True
         """
-        self._customers = []
+        self._customers = deque()
         self.max_cap = max_cap
         self.curr_cap = 0
         self.open = True
@@ -492,6 +935,7 @@ class Customer:
         Points to the <cid> of the customer standing behind.
         Points to None if no customer is standing behind.
     """
+    __slots__ = ('cid', 'num_items', 'join_time', 'finish_time', 'next')
 
     def __init__(self, cid, num_items):
         """ Initializes a Customer.
@@ -514,5 +958,298 @@ class Customer:
         self.next = None
 
 
+# The value stored in a CustomerTable time column for a time that is None.
+_NO_TIME = -2 ** 63
+
+
+class CustomerTable:
+    """ A table of customers stored column by column.
+
+    Each customer is a row, identified by an integer row id. Numeric fields
+    are kept in typed arrays, and each <cid> is interned so that it is only
+    stored once. The row of a customer that leaves the store is reused by
+    the next customer that joins, so the table only grows with the number of
+    customers in the store at the same time.
+
+    === Attributes ===
+    @type cids: list[str | None]
+        The <cid> of each row.
+    @type num_items: array[int]
+        The number of items of each row.
+    @type join_times: array[int]
+        The join time of each row, or _NO_TIME.
+    @type finish_times: array[int]
+        The finish time of each row, or _NO_TIME.
+    @type nexts: list[str | None]
+        The <cid> of the customer standing behind each row, or None.
+    @type lines: array[int]
+        The index of the line each row is in.
+
+    >>> table = CustomerTable()
+    >>> row = table.add('jerry', 8, 2)
+    >>> table.lines[row]
+    2
+    >>> customer = CustomerRow(table, row)
+    >>> customer.num_items
+    8
+    >>> customer.join_time is None
+    True
+    >>> customer.join_time = 3
+    >>> table.detach(row).join_time
+    3
+    >>> table.release(row)
+    >>> table.add('kay', 1, 0) == row
+    True
+    """
+    # === Private attributes ===
+    # @type _free: list[int]
+    #    The ids of rows that are not in use.
+
+    def __init__(self):
+        """ Initializes an empty CustomerTable.
+
+        @type self: CustomerTable
+        @rtype: None
+        """
+        self.cids = []
+        self.num_items = array('q')
+        self.join_times = array('q')
+        self.finish_times = array('q')
+        self.nexts = []
+        self.lines = array('i')
+        self._free = []
+
+    def add(self, cid, num_items, line_index):
+        """ Add a row for a customer with <cid> and <num_items> in the line
+        at <line_index>, and return its id.
+
+        @type self: CustomerTable
+        @type cid: str
+        @type num_items: int
+        @type line_index: int
+        @rtype: int
+        """
+        cid = sys.intern(cid)
+        # reuse a row that is not in use, if there is one
+        if len(self._free) > 0:
+            row = self._free.pop()
+            self.cids[row] = cid
+            self.num_items[row] = num_items
+            self.join_times[row] = _NO_TIME
+            self.finish_times[row] = _NO_TIME
+            self.nexts[row] = None
+            self.lines[row] = line_index
+        else:
+            row = len(self.cids)
+            self.cids.append(cid)
+            self.num_items.append(num_items)
+            self.join_times.append(_NO_TIME)
+            self.finish_times.append(_NO_TIME)
+            self.nexts.append(None)
+            self.lines.append(line_index)
+        return row
+
+    def release(self, row):
+        """ Mark the row <row> as no longer in use.
+
+        @type self: CustomerTable
+        @type row: int
+        @rtype: None
+        """
+        self.cids[row] = None
+        self.nexts[row] = None
+        self._free.append(row)
+
+    def detach(self, row):
+        """ Return a Customer object holding a copy of the row <row>.
+
+        @type self: CustomerTable
+        @type row: int
+        @rtype: Customer
+        """
+        customer = CustomerRow(self, row)
+        copy = Customer(customer.cid, customer.num_items)
+        copy.join_time = customer.join_time
+        copy.finish_time = customer.finish_time
+        copy.next = customer.next
+        return copy
+
+
+class CustomerRow:
+    """ A view of one row of a CustomerTable, with the same attributes as
+    Customer. Reading or setting an attribute reads or sets the table.
+
+    === Attributes ===
+    @type cid: str
+        The unique string assigned to a customer.
+    @type num_items: int
+        The number of items the customer is carrying.
+    @type join_time: int | None
+        The time at which the customer joined a checkout line.
+    @type finish_time: int | None
+        The time at which the customer finished checking out.
+    @type next: None | str
+        Points to the <cid> of the customer standing behind.
+        Points to None if no customer is standing behind.
+    """
+    # === Private attributes ===
+    # @type _table: CustomerTable
+    #    The table the row belongs to.
+    # @type _row: int
+    #    The id of the row.
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table, row):
+        """ Initializes a view of the row <row> of <table>.
+
+        @type self: CustomerRow
+        @type table: CustomerTable
+        @type row: int
+        @rtype: None
+        """
+        self._table = table
+        self._row = row
+
+    @property
+    def cid(self):
+        return self._table.cids[self._row]
+
+    @property
+    def num_items(self):
+        return self._table.num_items[self._row]
+
+    @property
+    def join_time(self):
+        time = self._table.join_times[self._row]
+        return None if time == _NO_TIME else time
+
+    @join_time.setter
+    def join_time(self, time):
+        self._table.join_times[self._row] = _NO_TIME if time is None else time
+
+    @property
+    def finish_time(self):
+        time = self._table.finish_times[self._row]
+        return None if time == _NO_TIME else time
+
+    @finish_time.setter
+    def finish_time(self, time):
+        self._table.finish_times[self._row] = \
+            _NO_TIME if time is None else time
+
+    @property
+    def next(self):
+        return self._table.nexts[self._row]
+
+    @next.setter
+    def next(self, cid):
+        self._table.nexts[self._row] = cid
+
+
+class RowQueue:
+    """ A first-in first-out queue of CustomerTable row ids, kept in a typed
+    array, with the methods of deque that checkout lines use.
+
+    Rows taken off the front are only dropped from the array once they are
+    at least half of it, so each operation takes amortized constant time.
+
+    >>> queue = RowQueue()
+    >>> for row in [4, 7, 9]:
+    ...     queue.append(row)
+    >>> queue.popleft()
+    4
+    >>> (len(queue), queue[0], queue[-1])
+    (2, 7, 9)
+    >>> list(reversed(queue))
+    [9, 7]
+    >>> queue.pop()
+    9
+    >>> list(queue)
+    [7]
+    """
+    # === Private attributes ===
+    # @type _rows: array[int]
+    #    The row ids, of which those from <_head> on are in the queue.
+    # @type _head: int
+    #    The position in <_rows> of the front of the queue.
+    __slots__ = ('_rows', '_head')
+
+    def __init__(self):
+        """ Initializes an empty RowQueue.
+
+        @type self: RowQueue
+        @rtype: None
+        """
+        self._rows = array('q')
+        self._head = 0
+
+    def __len__(self):
+        return len(self._rows) - self._head
+
+    def __getitem__(self, index):
+        """ Return the row at position <index> of the queue, counting from
+        the back if <index> is negative.
+
+        @type self: RowQueue
+        @type index: int
+        @rtype: int
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('RowQueue index out of range')
+        return self._rows[self._head + index]
+
+    def __iter__(self):
+        return iter(self._rows[self._head:])
+
+    def __reversed__(self):
+        return reversed(self._rows[self._head:])
+
+    def append(self, row):
+        """ Add <row> to the back of the queue.
+
+        @type self: RowQueue
+        @type row: int
+        @rtype: None
+        """
+        self._rows.append(row)
+
+    def popleft(self):
+        """ Remove and return the row at the front of the queue.
+
+        @type self: RowQueue
+        @rtype: int
+        """
+        if len(self) == 0:
+            raise IndexError('pop from an empty RowQueue')
+        row = self._rows[self._head]
+        self._head += 1
+        # drop the rows already taken off once they are half of the array
+        if self._head * 2 >= len(self._rows):
+            del self._rows[:self._head]
+            self._head = 0
+        return row
+
+    def pop(self):
+        """ Remove and return the row at the back of the queue.
+
+        @type self: RowQueue
+        @rtype: int
+        """
+        if len(self) == 0:
+            raise IndexError('pop from an empty RowQueue')
+        return self._rows.pop()
+
+    def clear(self):
+        """ Remove every row from the queue.
+
+        @type self: RowQueue
+        @rtype: None
+        """
+        del self._rows[:]
+        self._head = 0
+
+
 class ZeroItemError(Exception):
     pass
@@ -0,0 +1,141 @@
+"""Parameter Sweep
+
+This file contains functions that run the same event files against many
+grocery store configurations in parallel, and collect the statistics of
+every run into one table.
+"""
+# itertools.product builds the grid of configurations.
+import itertools
+import multiprocessing
+import sys
+from event import create_event_list
+from simulation import GroceryStoreSimulation
+from store import StoreConfig
+
+# The configuration keys of a grocery store, in the order used by the table.
+CONFIG_KEYS = StoreConfig.KEYS
+
+# The statistics collected from every run, in the order used by the table.
+STAT_KEYS = ['num_customers', 'total_time', 'max_wait', 'mean_wait',
+             'p50_wait', 'p95_wait', 'p99_wait']
+
+# The parsed events of every event file, set in each worker process by
+# _init_worker so that they are sent to a worker only once.
+_worker_events = None
+
+
+def config_grid(cashier_counts, express_counts, self_serve_counts,
+                line_capacities):
+    """Return a list of every configuration that combines one value from
+    each of the arguments.
+
+    @type cashier_counts: list[int]
+    @type express_counts: list[int]
+    @type self_serve_counts: list[int]
+    @type line_capacities: list[int]
+    @rtype: list[dict[str, int]]
+
+    >>> config_grid([1], [0, 1], [0], [10])[1]['express_count']
+    1
+    >>> len(config_grid([1, 2], [0, 1], [0, 1], [5, 10]))
+    16
+    """
+    grid = []
+    for values in itertools.product(cashier_counts, express_counts,
+                                    self_serve_counts, line_capacities):
+        grid.append(dict(zip(CONFIG_KEYS, values)))
+    return grid
+
+
+def _load_config(config):
+    """Return <config> as a StoreConfig, raising ValueError if it is not
+    valid.
+
+    @type config: str | dict[str, int] | StoreConfig
+        A configuration file name, or a configuration.
+    @rtype: StoreConfig
+    """
+    if isinstance(config, str):
+        return StoreConfig.load(config)
+    if isinstance(config, dict):
+        return StoreConfig.from_dict(config)
+    return config
+
+
+def _init_worker(events):
+    """Store the parsed <events> for the runs done by this worker process.
+
+    @type events: dict[str, list[Event]]
+    @rtype: None
+    """
+    global _worker_events
+    _worker_events = events
+
+
+def _run_one(task):
+    """Run one simulation and return its row of the result table.
+
+    @type task: (StoreConfig, str)
+        The configuration and the name of the event file to run.
+    @rtype: dict[str, object]
+    """
+    config, event_file = task
+    simulation = GroceryStoreSimulation(config)
+    stats = simulation._run_events(_worker_events[event_file])
+    row = config.as_dict()
+    row['event_file'] = event_file
+    for key in STAT_KEYS:
+        row[key] = stats[key]
+    return row
+
+
+def sweep(configs, event_files, processes=None):
+    """Run every event file in <event_files> against every configuration in
+    <configs>, and return one row of statistics per run.
+
+    Each event file is parsed once, in this process, and the parsed events
+    are sent once to each worker process. Rows are returned in the order of
+    <configs>, then <event_files>.
+
+    @type configs: list[str | dict[str, int] | StoreConfig]
+        Configuration file names or configurations, such as those returned
+        by config_grid. Every configuration is checked before any run
+        starts.
+    @type event_files: list[str]
+        Names of files containing raw lists of events.
+    @type processes: int | None
+        The number of worker processes, or None for one per CPU.
+    @rtype: list[dict[str, object]]
+        Each row has the configuration keys, 'event_file', and the
+        statistics named in STAT_KEYS.
+    """
+    events = {}
+    for event_file in event_files:
+        events[event_file] = create_event_list(event_file)
+    tasks = []
+    for config in configs:
+        config = _load_config(config)
+        for event_file in event_files:
+            tasks.append((config, event_file))
+    with multiprocessing.Pool(processes, _init_worker, (events,)) as pool:
+        return pool.map(_run_one, tasks)
+
+
+def write_table(rows, file):
+    """Write <rows> to <file> as tab-separated values with a header line.
+
+    @type rows: list[dict[str, object]]
+    @type file: file
+    @rtype: None
+    """
+    columns = CONFIG_KEYS + ['event_file'] + STAT_KEYS
+    file.write('\t'.join(columns) + '\n')
+    for row in rows:
+        file.write('\t'.join(str(row[column]) for column in columns) + '\n')
+
+
+if __name__ == '__main__':
+    # usage: python sweep.py <config file>... -- <event file>...
+    separator = sys.argv.index('--')
+    write_table(sweep(sys.argv[1:separator], sys.argv[separator + 1:]),
+                sys.stdout)
@@ -0,0 +1,93 @@
+# Unit Tests for binary_events
+# ---------------------------------------------
+import os
+import tempfile
+import unittest
+from binary_events import convert, replay, BinaryEventLog
+from event import create_event_list
+from event_stream import read_records
+from simulation import GroceryStoreSimulation
+from store import ZeroItemError
+from simulation_mode_tests import CASES, RUN_MODES, UNSORTED_CLOSE, \
+    normal_stats
+
+
+class BinaryReplayTest(unittest.TestCase):
+
+    def test_same_records_and_stats(self):
+        def vars_of(event):
+            return [type(event)] + [getattr(event, name) for name in
+                                    type(event).__slots__]
+        with tempfile.TemporaryDirectory() as directory:
+            binary_file = os.path.join(directory, 'events.bin')
+            for config, events in CASES + [UNSORTED_CLOSE]:
+                self.assertEqual(convert(events, binary_file),
+                                 len(list(read_records(events))))
+                with BinaryEventLog(binary_file) as log:
+                    self.assertEqual(list(log.records()),
+                                     list(read_records(events)))
+                    self.assertEqual([vars_of(event) for event in
+                                      log.events()],
+                                     [vars_of(event) for event in
+                                      create_event_list(events)])
+                stats = replay(GroceryStoreSimulation(config), binary_file)
+                self.assertEqual(stats, normal_stats(config, events))
+
+    def test_modes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            binary_file = os.path.join(directory, 'events.bin')
+            for config, events in CASES:
+                convert(events, binary_file)
+                expected = normal_stats(config, events)
+                for columnar, mode in RUN_MODES:
+                    with self.subTest(config=config, columnar=columnar,
+                                      mode=mode):
+                        self.assertEqual(replay(GroceryStoreSimulation(
+                            config, columnar), binary_file, mode), expected)
+            self.assertRaises(ValueError, replay,
+                              GroceryStoreSimulation(config), binary_file,
+                              'checkpointed')
+
+    def test_bad_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            events = os.path.join(directory, 'events.txt')
+            binary_file = os.path.join(directory, 'events.bin')
+            for line in ['5 Arrive x', '5 Leave x 3', '5 Close',
+                         'x Close 0', '5 Arrive x 3 4']:
+                with open(events, 'w') as file:
+                    file.write('1 Arrive anna 3\n' + line + '\n')
+                # convert rejects the lines the text readers reject
+                with self.assertRaises(ValueError):
+                    convert(events, binary_file)
+
+    def test_cid_table(self):
+        with tempfile.TemporaryDirectory() as directory:
+            events = os.path.join(directory, 'events.txt')
+            with open(events, 'w') as file:
+                file.write('1 Arrive anna 3\n2 Arrive bén 1\n3 Close 0\n'
+                           '4 Arrive anna 2\n')
+            binary_file = os.path.join(directory, 'events.bin')
+            convert(events, binary_file)
+            with BinaryEventLog(binary_file) as log:
+                self.assertEqual(log.cid(1), 'bén')
+                self.assertEqual(log.cid(0), 'anna')
+                self.assertEqual([record[2] for record in log.records()],
+                                 ['anna', 'bén', 0, 'anna'])
+
+    def test_error_during_replay(self):
+        with tempfile.TemporaryDirectory() as directory:
+            events = os.path.join(directory, 'events.txt')
+            with open(events, 'w') as file:
+                file.write('1 Arrive anna 3\n2 Arrive ben 0\n'
+                           '3 Arrive cy 2\n')
+            binary_file = os.path.join(directory, 'events.bin')
+            convert(events, binary_file)
+            # the run's own error comes out, not one from closing the log
+            for mode in ['normal', 'streaming', 'closed_form']:
+                with self.assertRaises(ZeroItemError):
+                    replay(GroceryStoreSimulation(
+                        'input_files/config_111_10.json'), binary_file, mode)
+
+
+if __name__ == '__main__':
+    unittest.main()
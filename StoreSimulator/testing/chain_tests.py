@@ -0,0 +1,28 @@
+# Unit Tests for chain
+# ---------------------------------------------
+import os
+import tempfile
+import unittest
+from chain import run_chain, load_manifest
+from simulation import merge_stats
+from simulation_mode_tests import CASES, normal_stats
+
+
+class ChainTest(unittest.TestCase):
+
+    def test_per_store_and_chain_stats(self):
+        with tempfile.TemporaryDirectory() as directory:
+            manifest = os.path.join(directory, 'manifest.json')
+            with open(manifest, 'w') as file:
+                file.write('[' + ', '.join(
+                    '{{"config": "{}", "events": "{}"}}'.format(
+                        os.path.abspath(config), os.path.abspath(events))
+                    for config, events in CASES) + ']')
+            per_store, chain = run_chain(load_manifest(manifest), 2)
+        expected = [normal_stats(config, events) for config, events in CASES]
+        self.assertEqual(per_store, expected)
+        self.assertEqual(chain, merge_stats(expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
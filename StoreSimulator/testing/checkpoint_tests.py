@@ -0,0 +1,52 @@
+# Unit Tests for checkpointed runs
+# ---------------------------------------------
+import os
+import tempfile
+import unittest
+import checkpoint
+from simulation import GroceryStoreSimulation
+from simulation_mode_tests import CASES, normal_stats
+
+
+class CheckpointTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.checkpoint = os.path.join(self.directory.name, 'sim.ckpt')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_same_stats(self):
+        for config, events in CASES:
+            stats = GroceryStoreSimulation(config).run(
+                events, 'checkpointed', self.checkpoint, checkpoint_interval=1)
+            self.assertEqual(stats, normal_stats(config, events))
+
+    def test_resume_after_crash(self):
+        config, events = CASES[-1]
+        saves = []
+        real_save = checkpoint.save_checkpoint
+
+        def crashing_save(filename, state):
+            # save twice, then crash while saving the third time
+            if len(saves) == 2:
+                raise KeyboardInterrupt
+            saves.append(state['last_event_timestamp'])
+            real_save(filename, state)
+
+        checkpoint.save_checkpoint = crashing_save
+        try:
+            with self.assertRaises(KeyboardInterrupt):
+                GroceryStoreSimulation(config).run(
+                    events, 'checkpointed', self.checkpoint,
+                    checkpoint_interval=2)
+        finally:
+            checkpoint.save_checkpoint = real_save
+        self.assertEqual(len(saves), 2)
+        self.assertEqual(checkpoint.resume(self.checkpoint),
+                         normal_stats(config, events))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+# Unit Tests for closed-form runs
+# ---------------------------------------------
+import os
+import tempfile
+import unittest
+from binary_events import convert, replay
+from simulation import GroceryStoreSimulation
+from simulation_mode_tests import CASES, UNSORTED_CLOSE, normal_stats
+
+
+class ClosedFormTest(unittest.TestCase):
+
+    def test_same_stats(self):
+        with tempfile.TemporaryDirectory() as directory:
+            binary_file = os.path.join(directory, 'events.bin')
+            for config, events in CASES + [UNSORTED_CLOSE]:
+                expected = normal_stats(config, events)
+                self.assertEqual(GroceryStoreSimulation(config).run(
+                    events, 'closed_form'), expected)
+                convert(events, binary_file)
+                self.assertEqual(replay(GroceryStoreSimulation(config),
+                                        binary_file, 'closed_form'),
+                                 expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+# Benchmark for the Priority Queue containers
+# ---------------------------------------------
+"""Compare PriorityQueue (sorted list) with HeapPriorityQueue (binary heap).
+
+For each queue size n, the queue is filled with n items and then used in a
+steady state of n add/remove pairs, which mirrors the simulation event loop
+where every removed event spawns new ones.
+
+Run from this directory with the src folder on the path, e.g.
+    PYTHONPATH=../src python container_benchmark.py
+"""
+import random
+import sys
+import time
+from container import PriorityQueue, HeapPriorityQueue
+
+
+class Stamped:
+    """An item ordered only by its <timestamp>, like an Event."""
+
+    def __init__(self, timestamp):
+        self.timestamp = timestamp
+
+    def __eq__(self, other):
+        return self.timestamp == other.timestamp
+
+    def __lt__(self, other):
+        return self.timestamp < other.timestamp
+
+    def __gt__(self, other):
+        return self.timestamp > other.timestamp
+
+
+def time_queue(queue_class, n, seed=148):
+    """Return the seconds taken to fill a <queue_class> with <n> items and
+    then perform <n> add/remove pairs on it.
+
+    @type queue_class: type
+    @type n: int
+    @type seed: int
+    @rtype: float
+    """
+    rng = random.Random(seed)
+    items = [Stamped(rng.randint(0, n)) for _ in range(2 * n)]
+    start = time.perf_counter()
+    pq = queue_class()
+    for item in items[:n]:
+        pq.add(item)
+    for item in items[n:]:
+        now = pq.remove().timestamp
+        # spawned events never happen before the event that spawned them
+        item.timestamp += now
+        pq.add(item)
+    return time.perf_counter() - start
+
+
+def main(sizes):
+    """Print a table of timings for each queue size in <sizes>.
+
+    @type sizes: list[int]
+    @rtype: None
+    """
+    print('{:>10} {:>14} {:>14} {:>9}'.format(
+        'n', 'sorted list s', 'heap s', 'speedup'))
+    for n in sizes:
+        list_time = time_queue(PriorityQueue, n)
+        heap_time = time_queue(HeapPriorityQueue, n)
+        print('{:>10} {:>14.4f} {:>14.4f} {:>8.1f}x'.format(
+            n, list_time, heap_time, list_time / heap_time))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main([int(arg) for arg in sys.argv[1:]])
+    else:
+        main([1000, 2000, 4000, 8000, 16000])
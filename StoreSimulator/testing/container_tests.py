@@ -0,0 +1,81 @@
+# Unit Tests for the Priority Queue containers
+# ---------------------------------------------
+import unittest
+import random
+from container import PriorityQueue, HeapPriorityQueue
+
+
+class Stamped:
+    """An item ordered only by its <timestamp>, used to check tie-breaking."""
+
+    def __init__(self, timestamp, name):
+        self.timestamp = timestamp
+        self.name = name
+
+    def __eq__(self, other):
+        return self.timestamp == other.timestamp
+
+    def __lt__(self, other):
+        return self.timestamp < other.timestamp
+
+    def __gt__(self, other):
+        return self.timestamp > other.timestamp
+
+
+def drain(pq):
+    """Remove every item from <pq> and return their names in order."""
+    names = []
+    while not pq.is_empty():
+        names.append(pq.remove().name)
+    return names
+
+
+class HeapPriorityQueueTest(unittest.TestCase):
+
+    def test_fifo_ties(self):
+        pq = HeapPriorityQueue()
+        for name in ['a', 'b', 'c', 'd']:
+            pq.add(Stamped(5, name))
+        self.assertEqual(drain(pq), ['a', 'b', 'c', 'd'])
+
+    def test_matches_stable_sort(self):
+        rng = random.Random(148)
+        items = [Stamped(rng.randint(0, 20), str(i)) for i in range(500)]
+        pq = HeapPriorityQueue()
+        for item in items:
+            pq.add(item)
+        expected = sorted(items, key=lambda item: item.timestamp)
+        self.assertEqual(drain(pq), [item.name for item in expected])
+
+    def test_same_order_as_sorted_list_without_ties(self):
+        rng = random.Random(2015)
+        timestamps = rng.sample(range(10000), 1000)
+        expected = PriorityQueue()
+        actual = HeapPriorityQueue()
+        for i in range(len(timestamps)):
+            if rng.random() < 0.6 or expected.is_empty():
+                item = Stamped(timestamps[i], str(i))
+                expected.add(item)
+                actual.add(item)
+            else:
+                self.assertEqual(actual.remove().name, expected.remove().name)
+        self.assertEqual(drain(actual), drain(expected))
+
+    def test_extend_keeps_fifo_ties(self):
+        rng = random.Random(10)
+        items = [Stamped(rng.randint(0, 20), str(i)) for i in range(500)]
+        pq = HeapPriorityQueue()
+        for item in items[:100]:
+            pq.add(item)
+        pq.extend(items[100:])
+        expected = sorted(items, key=lambda item: item.timestamp)
+        self.assertEqual(drain(pq), [item.name for item in expected])
+
+    def test_extend_empty(self):
+        pq = HeapPriorityQueue()
+        pq.extend([])
+        self.assertTrue(pq.is_empty())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+# Unit Tests for event_generator
+# ---------------------------------------------
+import os
+import tempfile
+import unittest
+from event_generator import write_events, geometric_items
+from simulation import GroceryStoreSimulation
+from simulation_mode_tests import RUN_MODES, normal_stats
+
+
+class GeneratedEventsTest(unittest.TestCase):
+    # a store with 3 lines of each type, and generated events for it that
+    # close 4 of the lines during a rush hour
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.config = os.path.join(self.directory.name, 'config.json')
+        with open(self.config, 'w') as file:
+            file.write('{"cashier_count": 3, "express_count": 3, '
+                       '"self_serve_count": 3, "line_capacity": 10}')
+        self.events = os.path.join(self.directory.name, 'events.txt')
+        written = write_events(self.events, 2000, rate=0.2,
+                               items=geometric_items(6),
+                               rushes=[(400, 600, 1.5)], num_lines=9,
+                               storms=[(500, 4, 50)], seed=148)
+        self.assertEqual(written, 2004)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_reproducible(self):
+        again = os.path.join(self.directory.name, 'again.txt')
+        write_events(again, 2000, rate=0.2, items=geometric_items(6),
+                     rushes=[(400, 600, 1.5)], num_lines=9,
+                     storms=[(500, 4, 50)], seed=148)
+        with open(self.events) as first, open(again) as second:
+            self.assertEqual(first.read(), second.read())
+
+    def test_modes_agree(self):
+        expected = normal_stats(self.config, self.events)
+        self.assertEqual(expected['num_customers'], 2000)
+        for columnar, mode in RUN_MODES:
+            with self.subTest(columnar=columnar, mode=mode):
+                self.assertEqual(GroceryStoreSimulation(
+                    self.config, columnar).run(self.events, mode), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+# Unit Tests for event_stream
+# ---------------------------------------------
+import os
+import tempfile
+import unittest
+from event import create_event_list
+from event_stream import stream_events, read_records
+
+
+class EventStreamTest(unittest.TestCase):
+
+    def test_same_events(self):
+        events = 'input_files/events_one_close_sorted.txt'
+        streamed = [(type(event), event.timestamp) for event in
+                    stream_events(events)]
+        expected = [(type(event), event.timestamp)
+                    for event in create_event_list(events)]
+        self.assertEqual(streamed, expected)
+
+    def test_bad_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            events = os.path.join(directory, 'events.txt')
+            for line in ['5 Arrive x', '5 Leave x 3', '5 Close',
+                         'x Close 0', '5 Arrive x 3 4']:
+                with open(events, 'w') as file:
+                    file.write('1 Arrive anna 3\n' + line + '\n')
+                # every reader rejects the same lines
+                with self.assertRaises(ValueError):
+                    create_event_list(events)
+                with self.assertRaises(ValueError):
+                    list(stream_events(events))
+                with self.assertRaises(ValueError):
+                    list(read_records(events))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+# Unit Tests for EventTrace
+# ---------------------------------------------
+import os
+import tempfile
+import unittest
+from event_trace import EventTrace, load_trace
+from simulation import GroceryStoreSimulation
+from simulation_mode_tests import CASES, normal_stats
+
+
+class TraceTest(unittest.TestCase):
+
+    def test_same_stats_and_rows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            trace_file = os.path.join(directory, 'events.trace')
+            for config, events in CASES:
+                memory = EventTrace()
+                self.assertEqual(GroceryStoreSimulation(
+                    config, trace=memory).run(events),
+                    normal_stats(config, events))
+                rows = memory.rows()
+                self.assertEqual(len(rows), memory.count)
+                # a small buffer is flushed to the file several times
+                with EventTrace(3, trace_file) as trace:
+                    GroceryStoreSimulation(config, True, trace=trace).run(
+                        events, 'batched')
+                columns = load_trace(trace_file)
+                names = columns['kind_names']
+                self.assertEqual(list(zip(
+                    columns['timestamps'],
+                    [names[kind] for kind in columns['kinds']],
+                    columns['lines'], columns['cids'],
+                    columns['depths'])), rows)
+                # without a file, only the latest rows are kept
+                ring = EventTrace(4)
+                GroceryStoreSimulation(config, trace=ring).run(events)
+                self.assertEqual(ring.rows(), rows[-4:])
+
+
+if __name__ == '__main__':
+    unittest.main()
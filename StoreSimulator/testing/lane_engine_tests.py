@@ -0,0 +1,21 @@
+# Unit Tests for lanes runs
+# ---------------------------------------------
+import unittest
+from simulation import GroceryStoreSimulation
+from simulation_mode_tests import CASES, UNSORTED_CLOSE, normal_stats
+
+
+class LanesTest(unittest.TestCase):
+
+    def test_same_stats(self):
+        for config, events in CASES + [UNSORTED_CLOSE,
+                                        ('input_files/config_111_10.json',
+                                         'input_files/events_two.txt')]:
+            expected = normal_stats(config, events)
+            for columnar in [False, True]:
+                self.assertEqual(GroceryStoreSimulation(config, columnar).run(
+                    events, 'lanes'), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
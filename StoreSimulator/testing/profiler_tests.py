@@ -0,0 +1,33 @@
+# Unit Tests for EventProfiler
+# ---------------------------------------------
+import unittest
+from profiler import EventProfiler
+from event_stream import read_records
+from simulation import GroceryStoreSimulation
+from simulation_mode_tests import CASES, normal_stats
+
+
+class ProfilerTest(unittest.TestCase):
+
+    def test_same_stats_and_counts(self):
+        for mode in ['normal', 'batched']:
+            for config, events in CASES:
+                profiler = EventProfiler()
+                stats = GroceryStoreSimulation(config, profiler=profiler).run(
+                    events, mode)
+                self.assertEqual(stats, normal_stats(config, events))
+                counts = profiler.events.values()
+                # every event but the initial ones was spawned by another
+                self.assertEqual(sum(count[0] for count in counts),
+                                 sum(count[2] for count in counts) +
+                                 len(list(read_records(events))))
+                self.assertGreaterEqual(profiler.methods['assign_line'][0],
+                                        stats['num_customers'])
+                # every checkout started looks up the customer at the front
+                self.assertEqual(profiler.methods['front_customer'][0],
+                                 profiler.events['CheckoutStarted'][0])
+                self.assertIn('store method', profiler.report())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+# Unit Tests for ResultCache
+# ---------------------------------------------
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+import result_cache
+from result_cache import ResultCache
+from simulation import GroceryStoreSimulation
+
+CONFIG = 'input_files/config_111_10.json'
+
+
+def cached_run(directory):
+    """Return the statistics of a run of events_one.txt through a
+    ResultCache in <directory>."""
+    return ResultCache(directory).run(CONFIG, 'input_files/events_one.txt')
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def entries(self):
+        return sorted(os.listdir(self.directory))
+
+    def test_hit(self):
+        cache = ResultCache(self.directory)
+        expected = GroceryStoreSimulation(CONFIG).run(
+            'input_files/events_one.txt')
+        self.assertEqual(cache.run(CONFIG, 'input_files/events_one.txt'),
+                         expected)
+        self.assertEqual(cache.run(CONFIG, 'input_files/events_one.txt',
+                                   mode='streaming'), expected)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # another cache on the same directory sees the entry
+        other = ResultCache(self.directory)
+        self.assertEqual(other.run(CONFIG, 'input_files/events_one.txt'),
+                         expected)
+        self.assertEqual(other.hits, 1)
+
+    def test_key_follows_content(self):
+        cache = ResultCache(self.directory)
+        events = os.path.join(self.directory, 'events.txt')
+        shutil.copy('input_files/events_one.txt', events)
+        key = cache.key(CONFIG, events)
+        self.assertEqual(key, cache.key(CONFIG, 'input_files/events_one.txt'))
+        self.assertNotEqual(key, cache.key(
+            'input_files/config_100_10.json', events))
+        self.assertNotEqual(key, ResultCache(self.directory, version='2').key(
+            CONFIG, events))
+        time.sleep(0.01)
+        with open(events, 'a') as file:
+            file.write('100 Arrive Zed 3\n')
+        self.assertNotEqual(key, cache.key(CONFIG, events))
+
+    def test_least_recently_used_are_evicted(self):
+        cache = ResultCache(self.directory)
+        for key in ['a', 'b', 'c']:
+            cache.put(key, {'key': key})
+            time.sleep(0.01)
+        size = os.path.getsize(os.path.join(self.directory, 'a.stats'))
+        cache.get('a')
+        cache.max_bytes = 2 * size
+        cache.put('d', {'key': 'd'})
+        self.assertEqual(self.entries(), ['a.stats', 'd.stats'])
+        self.assertIsNone(cache.get('b'))
+
+    def test_corrupt_entry_is_a_miss(self):
+        cache = ResultCache(self.directory)
+        expected = cache.run(CONFIG, 'input_files/events_one.txt')
+        key = cache.key(CONFIG, 'input_files/events_one.txt')
+        filename = os.path.join(self.directory, key + '.stats')
+        with open(filename, 'rb') as file:
+            content = file.read()
+        for corrupt in [b'', content[:len(content) // 2], b'not a pickle']:
+            with open(filename, 'wb') as file:
+                file.write(corrupt)
+            self.assertIsNone(cache.get(key))
+            self.assertEqual(self.entries(), [])
+            self.assertEqual(cache.run(CONFIG, 'input_files/events_one.txt'),
+                             expected)
+            self.assertEqual(self.entries(), [key + '.stats'])
+
+    def test_entry_removed_after_read(self):
+        cache = ResultCache(self.directory)
+        cache.put('a', {'key': 'a'})
+        with mock.patch('os.utime', side_effect=FileNotFoundError):
+            self.assertEqual(cache.get('a'), {'key': 'a'})
+
+    def test_scans_only_when_over_limit(self):
+        cache = ResultCache(self.directory)
+        with mock.patch('os.scandir', wraps=os.scandir) as scandir:
+            for key in ['a', 'b', 'c']:
+                cache.put(key, {'key': key})
+            # only the first put needs the size of the entries
+            self.assertEqual(scandir.call_count, 1)
+            cache.max_bytes = 1
+            cache.put('d', {'key': 'd'})
+            self.assertEqual(scandir.call_count, 2)
+        self.assertEqual(self.entries(), [])
+
+    def test_stale_temporary_files_removed(self):
+        for name in ['dead.tmp', 'writing.tmp']:
+            with open(os.path.join(self.directory, name), 'wb') as file:
+                file.write(b'half an entry')
+        # a writer died two hours ago, another is still writing
+        old = time.time() - 7200
+        os.utime(os.path.join(self.directory, 'dead.tmp'), (old, old))
+        ResultCache(self.directory).put('a', {'key': 'a'})
+        self.assertEqual(self.entries(), ['a.stats', 'writing.tmp'])
+
+    def test_version_follows_source(self):
+        self.assertEqual(result_cache.CACHE_VERSION,
+                         result_cache._source_hash())
+        with mock.patch.object(result_cache, '_SIMULATION_MODULES',
+                               ['store']):
+            self.assertNotEqual(result_cache._source_hash(),
+                                result_cache.CACHE_VERSION)
+
+    def test_concurrent_processes(self):
+        with multiprocessing.Pool(4) as pool:
+            results = pool.map(cached_run, [self.directory] * 8)
+        for stats in results:
+            self.assertEqual(stats, results[0])
+        self.assertEqual(len(self.entries()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
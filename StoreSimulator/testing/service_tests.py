@@ -0,0 +1,115 @@
+# Unit Tests for StoreService
+# ---------------------------------------------
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import unittest
+from service import StoreService
+from simulation import GroceryStoreSimulation
+from simulation_mode_tests import CASES
+
+
+class StoreServiceTest(unittest.TestCase):
+
+    def run_feed(self, config, events):
+        """Return the service after feeding it <events> as a live feed, and
+        its last snapshot."""
+        service = StoreService(config)
+        with open(events, 'rb') as file:
+            data = file.read()
+
+        async def feed():
+            reader = asyncio.StreamReader()
+            # split the feed in the middle of lines
+            for i in range(0, len(data), 7):
+                reader.feed_data(data[i:i + 7])
+            reader.feed_eof()
+            await service.feed(reader)
+        asyncio.run(feed())
+        service.finish()
+        stats = service.snapshot()
+        return service, stats
+
+    def test_same_stats(self):
+        for config, events in CASES:
+            expected = GroceryStoreSimulation(config).run(events)
+            service, stats = self.run_feed(config, events)
+            self.assertEqual(stats['clock'], expected['total_time'])
+            self.assertEqual(stats['num_customers'],
+                             expected['num_customers'])
+            self.assertEqual(stats['max_wait'], expected['max_wait'])
+            self.assertEqual(stats['lines_served'], expected['lines_served'])
+            self.assertEqual(stats['recent_p99_wait'], expected['p99_wait'])
+            self.assertEqual(stats['late_events'], 0)
+            self.assertEqual(sum(stats['queue_lengths']), 0)
+
+    def test_late_events(self):
+        service = StoreService('input_files/config_111_10.json')
+        service.feed_lines(['10 Arrive anna 3\n', '4 Arrive ben 2\n'])
+        self.assertEqual(service.late_events, 1)
+        self.assertEqual(service.clock, 10)
+        self.assertEqual(sum(service.snapshot()['queue_lengths']), 2)
+
+    def test_slow_subscriber(self):
+        service = StoreService('input_files/config_111_10.json')
+        queue = service.subscribe(2)
+        for line in ['1 Arrive anna 3\n', '2 Arrive ben 2\n',
+                     '3 Arrive cy 1\n']:
+            service.feed_lines([line])
+            service.publish()
+        # only the newest snapshots are kept
+        self.assertEqual(queue.qsize(), 2)
+        self.assertEqual(queue.get_nowait()['clock'], 2)
+        self.assertEqual(queue.get_nowait()['clock'], 3)
+
+    def test_bad_lines(self):
+        service = StoreService('input_files/config_111_10.json')
+        service.feed_lines(['1 Arrive anna 3\n', 'garbage\n', '2 Close 9\n',
+                            '3 Arrive ben two\n', '\n', '4 Arrive cy 2\n'])
+        self.assertEqual(service.bad_lines, 3)
+        stats = service.snapshot()
+        self.assertEqual(stats['bad_lines'], 3)
+        self.assertEqual(stats['num_customers'], 2)
+
+    def test_zero_items(self):
+        service = StoreService('input_files/config_111_10.json')
+        service.feed_lines(['1 Arrive anna 3\n', '2 Arrive b 0\n',
+                            '3 Arrive cy 2\n'])
+        self.assertEqual(service.bad_lines, 1)
+        self.assertEqual(service.clock, 3)
+        self.assertEqual(service.snapshot()['num_customers'], 2)
+
+    def test_no_open_line(self):
+        service = StoreService('input_files/config_111_10.json')
+        service.feed_lines(['1 Close 0\n', '2 Close 1\n', '3 Close 2\n',
+                            '4 Arrive anna 3\n', '2 Arrive ben 1\n'])
+        # neither arrival has a line to join, late or not
+        self.assertEqual(service.bad_lines, 2)
+        self.assertEqual(service.late_events, 0)
+        self.assertEqual(service.clock, 3)
+        self.assertEqual(service.snapshot()['num_customers'], 0)
+
+    def test_file_on_stdin(self):
+        config = 'input_files/config_111_10.json'
+        events = 'input_files/events_one_close_sorted.txt'
+        environment = dict(os.environ)
+        environment['PYTHONPATH'] = os.pathsep.join(
+            [os.path.join(os.pardir, 'src')] +
+            [path for path in [environment.get('PYTHONPATH')] if path])
+        # a regular file on standard input cannot be read through the event
+        # loop
+        with open(events) as file:
+            output = subprocess.run(
+                [sys.executable, os.path.join(os.pardir, 'src', 'service.py'),
+                 config, '--interval', '0.01'], stdin=file,
+                stdout=subprocess.PIPE, env=environment, check=True).stdout
+        stats = json.loads(output.decode('utf-8').splitlines()[-1])
+        expected = GroceryStoreSimulation(config).run(events)
+        self.assertEqual(stats['num_customers'], expected['num_customers'])
+        self.assertEqual(stats['clock'], expected['total_time'])
+
+
+if __name__ == '__main__':
+    unittest.main()
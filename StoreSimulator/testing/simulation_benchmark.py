@@ -0,0 +1,266 @@
+# Benchmark for GroceryStoreSimulation
+# ---------------------------------------------
+"""Measure how GroceryStoreSimulation.run scales with the number of events
+and the number of lines.
+
+For each (number of customers, lines per type) pair, a synthetic event file
+is generated and run twice, each time in a fresh process:
+    - a timed run, which gives the events processed per second and the peak
+      resident set size of the process;
+    - a profiled run, in which every queue operation and every GroceryStore
+      method call is timed, which gives the split of the run time between
+      the queue, the store and everything else.
+A log-log fit of run time against the number of customers gives the scaling
+exponent of each line count (1.0 is linear).
+
+Results are written as JSON. Passing a previous result file with --baseline
+reports every exponent that grew by more than --tolerance.
+
+Run from this directory with the src folder on the path, e.g.
+    PYTHONPATH=../src python simulation_benchmark.py --out bench.json
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from event_generator import write_events
+from profiler import STORE_METHODS
+from simulation import GroceryStoreSimulation
+
+# The queue methods timed in the profiled run.
+QUEUE_METHODS = ['add', 'extend', 'remove', 'peek', 'is_empty']
+
+
+def make_inputs(directory, num_customers, lines_per_type, seed=148):
+    """Write a configuration and an event file to <directory>, and return
+    their names.
+
+    The arrival rate grows with the number of lines so that the store stays
+    busy without running out of room.
+
+    @type directory: str
+    @type num_customers: int
+    @type lines_per_type: int
+    @type seed: int
+    @rtype: (str, str)
+    """
+    config_file = os.path.join(directory, 'config_{}.json'.format(
+        lines_per_type))
+    with open(config_file, 'w') as file:
+        json.dump({'cashier_count': lines_per_type,
+                   'express_count': lines_per_type,
+                   'self_serve_count': lines_per_type,
+                   'line_capacity': 10}, file)
+    event_file = os.path.join(directory, 'events_{}_{}.txt'.format(
+        num_customers, lines_per_type))
+    write_events(event_file, num_customers, rate=0.1 * lines_per_type,
+                 seed=seed)
+    return config_file, event_file
+
+
+def _timed(method, totals, key, depth):
+    """Return <method> wrapped so that the time spent in its outermost calls
+    is added to totals[key], and its number of calls to totals[key + '_calls'].
+
+    <depth> is a one-item list shared by every wrapped method of an object,
+    so that time spent in a method called by another is only counted once.
+
+    @type method: callable
+    @type totals: dict[str, float]
+    @type key: str
+    @type depth: list[int]
+    @rtype: callable
+    """
+    def wrapper(*args):
+        totals[key + '_calls'] += 1
+        depth[0] += 1
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            depth[0] -= 1
+            if depth[0] == 0:
+                totals[key] += time.perf_counter() - start
+    return wrapper
+
+
+def _instrument(simulation):
+    """Time the queue and store method calls of <simulation>, and return the
+    dict the totals are collected in.
+
+    @type simulation: GroceryStoreSimulation
+    @rtype: dict[str, float]
+    """
+    totals = {'queue': 0.0, 'queue_calls': 0, 'store': 0.0, 'store_calls': 0,
+              'remove_calls': 0}
+    queue_depth = [0]
+    store_depth = [0]
+    queue = simulation._events
+    for name in QUEUE_METHODS:
+        setattr(queue, name,
+                _timed(getattr(queue, name), totals, 'queue', queue_depth))
+    # count removals separately: every processed event is removed once
+    queue.remove = _timed(queue.remove, totals, 'remove', [1])
+    store = simulation._store
+    for name in STORE_METHODS:
+        setattr(store, name,
+                _timed(getattr(store, name), totals, 'store', store_depth))
+    return totals
+
+
+def _child(config_file, event_file, profiled, connection):
+    """Run one simulation and send its measurements through <connection>.
+
+    @type config_file: str
+    @type event_file: str
+    @type profiled: bool
+    @type connection: multiprocessing.connection.Connection
+    @rtype: None
+    """
+    simulation = GroceryStoreSimulation(config_file)
+    totals = _instrument(simulation) if profiled else None
+    start = time.perf_counter()
+    stats = simulation.run(event_file)
+    seconds = time.perf_counter() - start
+    result = {'seconds': seconds, 'num_customers': stats['num_customers'],
+              # ru_maxrss is in kilobytes on Linux
+              'peak_rss_kb': resource.getrusage(
+                  resource.RUSAGE_SELF).ru_maxrss}
+    if profiled:
+        result['events'] = totals['remove_calls']
+        result['queue_seconds'] = totals['queue']
+        result['store_seconds'] = totals['store']
+        result['other_seconds'] = seconds - totals['queue'] - totals['store']
+        result['queue_calls'] = totals['queue_calls']
+        result['store_calls'] = totals['store_calls']
+    connection.send(result)
+    connection.close()
+
+
+def measure(config_file, event_file, profiled):
+    """Return the measurements of one run, done in a fresh process.
+
+    @type config_file: str
+    @type event_file: str
+    @type profiled: bool
+    @rtype: dict[str, float]
+    """
+    context = multiprocessing.get_context('spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_child, args=(config_file, event_file,
+                                                   profiled, sender))
+    process.start()
+    result = receiver.recv()
+    process.join()
+    return result
+
+
+def _slope(xs, ys):
+    """Return the least-squares slope of log(ys) against log(xs), or None if
+    there are fewer than two points.
+
+    @type xs: list[float]
+    @type ys: list[float]
+    @rtype: float | None
+    """
+    if len(xs) < 2:
+        return None
+    log_xs = [math.log(x) for x in xs]
+    log_ys = [math.log(y) for y in ys]
+    mean_x = sum(log_xs) / len(log_xs)
+    mean_y = sum(log_ys) / len(log_ys)
+    covariance = sum((x - mean_x) * (y - mean_y)
+                     for x, y in zip(log_xs, log_ys))
+    variance = sum((x - mean_x) ** 2 for x in log_xs)
+    return covariance / variance
+
+
+def run_benchmark(customer_counts, line_counts):
+    """Run every combination of <customer_counts> and <line_counts>, and
+    return the results.
+
+    @type customer_counts: list[int]
+    @type line_counts: list[int]
+        Numbers of lines of each type.
+    @rtype: dict[str, object]
+    """
+    runs = []
+    exponents = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for lines_per_type in line_counts:
+            seconds = []
+            for num_customers in customer_counts:
+                config_file, event_file = make_inputs(
+                    directory, num_customers, lines_per_type)
+                timed = measure(config_file, event_file, False)
+                profiled = measure(config_file, event_file, True)
+                run = {'customers': num_customers,
+                       'lines': 3 * lines_per_type,
+                       'events': profiled['events'],
+                       'seconds': timed['seconds'],
+                       'events_per_second':
+                           profiled['events'] / timed['seconds'],
+                       'peak_rss_kb': timed['peak_rss_kb']}
+                for key in ['queue_seconds', 'store_seconds', 'other_seconds',
+                            'queue_calls', 'store_calls']:
+                    run['profiled_' + key] = profiled[key]
+                runs.append(run)
+                seconds.append(timed['seconds'])
+                print(json.dumps(run), file=sys.stderr)
+            exponents[str(3 * lines_per_type)] = _slope(customer_counts,
+                                                        seconds)
+    return {'python': sys.version.split()[0], 'runs': runs,
+            'exponents': exponents}
+
+
+def compare(results, baseline, tolerance):
+    """Return a message for every scaling exponent in <results> that is
+    larger than the one in <baseline> by more than <tolerance>.
+
+    @type results: dict[str, object]
+    @type baseline: dict[str, object]
+    @type tolerance: float
+    @rtype: list[str]
+    """
+    messages = []
+    for lines, exponent in results['exponents'].items():
+        before = baseline['exponents'].get(lines)
+        if exponent is not None and before is not None and \
+                exponent > before + tolerance:
+            messages.append('{} lines: scaling exponent {:.2f} -> {:.2f}'
+                            .format(lines, before, exponent))
+    return messages
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark GroceryStoreSimulation.run.')
+    parser.add_argument('--customers', default='2000,4000,8000,16000',
+                        help='comma-separated customer counts')
+    parser.add_argument('--lines', default='1,4,16',
+                        help='comma-separated numbers of lines of each type')
+    parser.add_argument('--out', help='file to write the JSON results to')
+    parser.add_argument('--baseline', help='previous JSON results')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = run_benchmark([int(n) for n in args.customers.split(',')],
+                            [int(n) for n in args.lines.split(',')])
+    text = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, 'w') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for message in regressions:
+            print('REGRESSION: ' + message, file=sys.stderr)
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,186 @@
+# Unit Tests for the alternative GroceryStoreSimulation run modes
+# ---------------------------------------------
+# Every run mode must produce exactly the same statistics as a normal run.
+import json
+import os
+import random
+import tempfile
+import unittest
+from simulation import GroceryStoreSimulation, merge_stats, run_many
+from profiler import EventProfiler
+from event_trace import EventTrace
+
+# (config, events) pairs whose event files are sorted by timestamp, so they
+# are usable by every run mode
+CASES = [('input_files/config_100_10.json', 'input_files/events_one.txt'),
+         ('input_files/config_010_10.json', 'input_files/events_one.txt'),
+         ('input_files/config_001_10.json', 'input_files/events_one.txt'),
+         ('input_files/config_111_10.json', 'input_files/events_one.txt'),
+         ('input_files/config_111_10.json',
+          'input_files/events_one_close_sorted.txt')]
+# (columnar, mode) for every run mode other than the normal one, except
+# checkpointed runs, which need a file
+RUN_MODES = [(True, 'normal'),
+             (False, 'streaming'),
+             (False, 'batched'),
+             (False, 'streaming_batched'),
+             (False, 'closed_form'),
+             (False, 'lanes'),
+             (True, 'lanes')]
+# a close file that is not sorted by timestamp, for the run modes that sort
+UNSORTED_CLOSE = ('input_files/config_111_10.json',
+                  'input_files/events_one_close.txt')
+
+
+def normal_stats(config, events):
+    """Return the statistics of a normal run of <events> under <config>."""
+    return GroceryStoreSimulation(config).run(events)
+
+
+def random_closure_files(count=60):
+    """Yield (config, events) for <count> small random stores and event
+    files that close lines at the same times as arrivals, finishes and other
+    closures. Line 0 is never closed, but some customers may still find no
+    line with room."""
+    with tempfile.TemporaryDirectory() as directory:
+        config = os.path.join(directory, 'config.json')
+        events = os.path.join(directory, 'events.txt')
+        for seed in range(count):
+            rng = random.Random(seed)
+            counts = [rng.randint(1, 4), rng.randint(0, 3), rng.randint(0, 3)]
+            with open(config, 'w') as file:
+                json.dump({'cashier_count': counts[0],
+                           'express_count': counts[1],
+                           'self_serve_count': counts[2],
+                           'line_capacity': rng.randint(6, 30)}, file)
+            now = 0
+            with open(events, 'w') as file:
+                for i in range(rng.randint(5, 200)):
+                    now += rng.choice([0, 2, 5, 8, 13, 21])
+                    if sum(counts) > 1 and rng.random() < 0.08:
+                        file.write('{} Close {}\n'.format(
+                            now, rng.randrange(1, sum(counts))))
+                    else:
+                        file.write('{} Arrive c{} {}\n'.format(
+                            now, i, rng.randint(1, 12)))
+            yield config, events
+
+
+class StreamingRunTest(unittest.TestCase):
+
+    def test_same_stats(self):
+        for config, events in CASES:
+            stats = GroceryStoreSimulation(config).run(events, 'streaming')
+            self.assertEqual(stats, normal_stats(config, events))
+
+    def test_streaming_batches(self):
+        for config, events in CASES:
+            stats = GroceryStoreSimulation(config).run(events,
+                                                       'streaming_batched')
+            self.assertEqual(stats, normal_stats(config, events))
+
+
+class BatchedRunTest(unittest.TestCase):
+
+    def test_same_stats(self):
+        for config, events in CASES + [
+                ('input_files/config_111_10.json',
+                 'input_files/events_one_close.txt'),
+                ('input_files/config_111_10.json',
+                 'input_files/events_two.txt')]:
+            stats = GroceryStoreSimulation(config).run(events, 'batched')
+            self.assertEqual(stats, normal_stats(config, events))
+
+
+class ColumnarRunTest(unittest.TestCase):
+
+    def test_same_stats(self):
+        for config, events in CASES + [
+                ('input_files/config_111_10.json',
+                 'input_files/events_one_close.txt'),
+                ('input_files/config_111_10.json',
+                 'input_files/events_two.txt')]:
+            stats = GroceryStoreSimulation(config, columnar=True).run(events)
+            self.assertEqual(stats, normal_stats(config, events))
+
+
+class WaitStatsTest(unittest.TestCase):
+
+    def test_quantiles_and_lines(self):
+        stats = normal_stats('input_files/config_111_10.json',
+                             'input_files/events_one_close.txt')
+        self.assertEqual(stats['wait_times'].count, 4)
+        self.assertEqual(stats['p99_wait'], stats['max_wait'])
+        self.assertEqual(sum(stats['lines_served']), 4)
+        self.assertEqual(len(stats['lines_throughput']), 3)
+
+    def test_merge(self):
+        runs = [normal_stats(config, events) for config, events in CASES]
+        merged = merge_stats(runs)
+        self.assertEqual(merged['num_customers'],
+                         sum(stats['num_customers'] for stats in runs))
+        self.assertEqual(merged['max_wait'],
+                         max(stats['max_wait'] for stats in runs))
+        self.assertEqual(merged['wait_times'].count,
+                         sum(stats['wait_times'].count for stats in runs))
+
+
+class RandomClosuresTest(unittest.TestCase):
+
+    def test_modes_agree(self):
+        for config, events in random_closure_files():
+            try:
+                expected = normal_stats(config, events)
+            except ValueError:
+                # some customer found no line with room
+                expected = None
+            for columnar, mode in RUN_MODES:
+                with self.subTest(config=config, columnar=columnar,
+                                  mode=mode):
+                    simulation = GroceryStoreSimulation(config, columnar)
+                    if expected is None:
+                        self.assertRaises(ValueError, simulation.run, events,
+                                          mode)
+                    else:
+                        self.assertEqual(simulation.run(events, mode),
+                                         expected)
+
+
+class RunModeTest(unittest.TestCase):
+
+    def test_bad_modes(self):
+        config, events = CASES[0]
+        self.assertRaises(ValueError, GroceryStoreSimulation(config).run,
+                          events, 'eventless')
+        # a checkpoint file is given exactly for a checkpointed run
+        self.assertRaises(ValueError, GroceryStoreSimulation(config).run,
+                          events, 'checkpointed')
+        self.assertRaises(ValueError, GroceryStoreSimulation(config).run,
+                          events, 'streaming', 'never_written.checkpoint')
+        for mode in ['checkpointed', 'closed_form', 'lanes']:
+            for recorder in [{'profiler': EventProfiler()},
+                             {'trace': EventTrace()}]:
+                self.assertRaises(ValueError, GroceryStoreSimulation(
+                    config, **recorder).run, events, mode,
+                    'never_written.checkpoint' if mode == 'checkpointed'
+                    else None)
+
+
+class RunManyTest(unittest.TestCase):
+
+    def test_same_stats(self):
+        config = 'input_files/config_111_10.json'
+        event_files = [events for case_config, events in CASES
+                       if case_config == config]
+        event_files.append('input_files/events_two.txt')
+        expected = [normal_stats(config, events) for events in event_files]
+        for columnar in [False, True]:
+            simulation = GroceryStoreSimulation(config, columnar)
+            self.assertEqual(run_many(simulation, event_files), expected)
+            # and again, after the simulation has been used
+            self.assertEqual(run_many(simulation, event_files[::-1]),
+                             expected[::-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
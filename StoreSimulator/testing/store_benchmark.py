@@ -0,0 +1,158 @@
+# Benchmark for GroceryStore
+# ---------------------------------------------
+"""Measure the time and memory used by a GroceryStore holding a large number
+of queued customers.
+
+The store is filled through assign_line and add_customer, then drained
+through remove_customer_front, once with Customer objects and once with the
+columnar CustomerTable. Memory is measured with tracemalloc and reported per
+queued customer.
+
+Run from this directory with the src folder on the path, e.g.
+    PYTHONPATH=../src python store_benchmark.py 1000000
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from store import GroceryStore, Customer
+
+
+class DictCustomer:
+    """A Customer without __slots__, used to compare memory use."""
+
+    def __init__(self, cid, num_items):
+        self.cid = cid
+        self.num_items = num_items
+        self.join_time = None
+        self.finish_time = None
+        self.next = None
+
+
+def make_store(num_lines, capacity, columnar=False):
+    """Return a GroceryStore with <num_lines> lines of each type, each with
+    room for <capacity> customers.
+
+    @type num_lines: int
+    @type capacity: int
+    @type columnar: bool
+    @rtype: GroceryStore
+    """
+    config = {'cashier_count': num_lines, 'express_count': num_lines,
+              'self_serve_count': num_lines, 'line_capacity': capacity}
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'config.json')
+        with open(filename, 'w') as file:
+            json.dump(config, file)
+        return GroceryStore(filename, columnar)
+
+
+def fill_store(store, cids):
+    """Add a customer with each cid in <cids> to <store>.
+
+    @type store: GroceryStore
+    @type cids: list[str]
+    @rtype: None
+    """
+    for i in range(len(cids)):
+        num_items = i % 12 + 1
+        line_index = store.assign_line(Customer(cids[i], num_items))
+        store.add_customer(cids[i], num_items, line_index)
+        store.set_join_time(store.find_customer(cids[i]), i)
+
+
+def drain_store(store, finish_time):
+    """Remove every customer from <store>, front first.
+
+    @type store: GroceryStore
+    @type finish_time: int
+    @rtype: None
+    """
+    line_index = 0
+    while line_index < len(store._cashiers):
+        line = store.find_cashier_line(line_index)
+        while line.curr_cap > 0:
+            store.set_finish_time(store.front_customer(line_index),
+                                  finish_time)
+            store.remove_customer_front(line_index)
+        line_index += 1
+
+
+def bench_store(num_customers, num_lines, columnar=False):
+    """Fill and drain a store with <num_customers> customers spread over
+    3 * <num_lines> lines, and return a dict of the measurements.
+
+    Timing and memory are measured in separate runs, since tracemalloc
+    slows down the code it traces.
+
+    @type num_customers: int
+    @type num_lines: int
+    @type columnar: bool
+    @rtype: dict[str, float]
+    """
+    cids = [str(i) for i in range(num_customers)]
+
+    store = make_store(num_lines, num_customers, columnar)
+    start = time.perf_counter()
+    fill_store(store, cids)
+    fill_time = time.perf_counter() - start
+    start = time.perf_counter()
+    drain_store(store, num_customers)
+    drain_time = time.perf_counter() - start
+
+    store = make_store(num_lines, num_customers, columnar)
+    tracemalloc.start()
+    fill_store(store, cids)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return {'customers': num_customers,
+            'fill_s': fill_time,
+            'drain_s': drain_time,
+            'bytes_per_customer': memory / num_customers}
+
+
+def customer_size(customer_class, count=100000):
+    """Return the average number of bytes used by one <customer_class>
+    instance, measured over <count> instances.
+
+    @type customer_class: type
+    @type count: int
+    @rtype: float
+    """
+    tracemalloc.start()
+    customers = [customer_class(i, 1) for i in range(count)]
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del customers
+    return memory / count
+
+
+def main(num_customers, num_lines):
+    """Print the measurements for a store of <num_customers> customers.
+
+    @type num_customers: int
+    @type num_lines: int
+    @rtype: None
+    """
+    print('Customer with __slots__: {:.0f} bytes'.format(
+        customer_size(Customer)))
+    print('Customer with __dict__:  {:.0f} bytes'.format(
+        customer_size(DictCustomer)))
+    for columnar in [False, True]:
+        results = bench_store(num_customers, num_lines, columnar)
+        print('{} customers over {} lines, {}'.format(
+            num_customers, 3 * num_lines,
+            'columnar' if columnar else 'Customer objects'))
+        print('  fill:  {:.2f} s'.format(results['fill_s']))
+        print('  drain: {:.2f} s'.format(results['drain_s']))
+        print('  store memory: {:.0f} bytes per queued customer'.format(
+            results['bytes_per_customer']))
+
+
+if __name__ == '__main__':
+    customers = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    main(customers, lines)
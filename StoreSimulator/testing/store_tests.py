@@ -0,0 +1,301 @@
+# Unit Tests for GroceryStore
+# ---------------------------------------------
+import unittest
+import random
+import json
+import os
+import tempfile
+from collections import deque
+from store import GroceryStore, Customer, ExpressCheckout, StoreConfig, \
+    RowQueue
+from simulation import GroceryStoreSimulation
+
+
+class CustomerIndexTest(unittest.TestCase):
+    columnar = False
+
+    def setUp(self):
+        self.store = GroceryStore('input_files/config_111_10.json',
+                                  self.columnar)
+        self.store.add_customer('eos', 1, 0)
+        self.store.add_customer('yvonne', 9, 0)
+        self.store.add_customer('kay', 1, 1)
+        self.store.add_customer('ingram', 3, 0)
+
+    def test_find_after_add(self):
+        self.assertEqual(self.store.find_cashier_line_index('yvonne'), 0)
+        self.assertEqual(self.store.find_cashier_line_index('kay'), 1)
+        self.assertEqual(self.store.find_customer('kay').num_items, 1)
+        self.assertEqual(self.store.find_customer('eos').cid, 'eos')
+
+    def test_missing(self):
+        self.assertIsNone(self.store.find_customer('nobody'))
+        self.assertIsNone(self.store.find_cashier_line_index('nobody'))
+
+    def test_remove_front(self):
+        self.store.set_join_time(self.store.find_customer('eos'), 0)
+        self.store.set_finish_time(self.store.find_customer('eos'), 8)
+        self.store.remove_customer_front(0)
+        self.assertIsNone(self.store.find_customer('eos'))
+        self.assertEqual(self.store.find_cashier_line_index('yvonne'), 0)
+
+    def test_remove_back(self):
+        self.store.remove_customer_back(0)
+        self.assertIsNone(self.store.find_customer('ingram'))
+        self.assertEqual(self.store.find_cashier_line_index('yvonne'), 0)
+
+    def test_close_and_reassign(self):
+        displaced = self.store.close_c(0)
+        self.assertEqual([c.cid for c in displaced], ['ingram', 'yvonne'])
+        self.assertIsNone(self.store.find_customer('yvonne'))
+        self.assertEqual(self.store.find_cashier_line_index('eos'), 0)
+        for customer in displaced:
+            line = self.store.assign_line(Customer(customer.cid,
+                                                   customer.num_items))
+            self.store.add_customer(customer.cid, customer.num_items, line)
+        self.assertEqual(self.store.find_cashier_line_index('ingram'), 2)
+        self.assertEqual(self.store.find_cashier_line_index('yvonne'), 2)
+
+
+def brute_force_line(store, customer):
+    """Return the line <customer> should join, found by checking every line
+    of <store> in turn."""
+    best = None
+    for i in range(len(store._cashiers)):
+        line = store.find_cashier_line(i)
+        if customer.num_items < 8:
+            available = line.open and line.curr_cap <= line.max_cap
+        else:
+            available = line.open and line.curr_cap != line.max_cap and \
+                type(line) != ExpressCheckout
+        if available and (best is None or line.curr_cap <
+                          store.find_cashier_line(best).curr_cap):
+            best = i
+    return best
+
+
+class AssignLineTest(unittest.TestCase):
+    columnar = False
+
+    def test_ties_go_to_lowest_index(self):
+        store = GroceryStore('input_files/config_111_10.json', self.columnar)
+        self.assertEqual(store.assign_line(Customer('a', 1)), 0)
+        store.add_customer('a', 1, 0)
+        self.assertEqual(store.assign_line(Customer('b', 1)), 1)
+        self.assertEqual(store.assign_line(Customer('c', 9)), 2)
+
+    def test_matches_brute_force(self):
+        rng = random.Random(148)
+        store = GroceryStore('input_files/config_111_10.json', self.columnar)
+        for i in range(3000):
+            choice = rng.random()
+            if choice < 0.55:
+                customer = Customer(str(i), rng.randint(1, 12))
+                line = store.assign_line(customer)
+                self.assertEqual(line, brute_force_line(store, customer))
+                if line is not None:
+                    store.add_customer(customer.cid, customer.num_items, line)
+            else:
+                line = rng.randrange(3)
+                if not store.is_empty(line):
+                    customer = store._customer(
+                        store.find_cashier_line(line)._customers[0])
+                    store.set_join_time(customer, 0)
+                    store.set_finish_time(customer, 1)
+                    store.remove_customer_front(line)
+
+    def test_closed_lines_are_skipped(self):
+        store = GroceryStore('input_files/config_111_10.json', self.columnar)
+        store.close_c(0)
+        self.assertEqual(store.assign_line(Customer('a', 1)), 1)
+        self.assertEqual(store.assign_line(Customer('b', 9)), 2)
+        store.close_c(2)
+        self.assertIsNone(store.assign_line(Customer('c', 9)))
+
+
+class CloseLineTest(unittest.TestCase):
+    columnar = False
+
+    def setUp(self):
+        self.store = GroceryStore('input_files/config_111_10.json',
+                                  self.columnar)
+        for i in range(6):
+            self.store.add_customer(str(i), 2 + i, 0)
+            self.store.set_join_time(self.store.find_customer(str(i)), i)
+        self.store.add_customer('kay', 1, 1)
+
+    def test_close(self):
+        displaced = self.store.close_c(0)
+        self.assertEqual([c.cid for c in displaced],
+                         ['5', '4', '3', '2', '1'])
+        self.assertEqual([c.join_time for c in displaced], [5, 4, 3, 2, 1])
+        line = self.store.find_cashier_line(0)
+        self.assertEqual(line.curr_cap, 1)
+        self.assertFalse(line.open)
+        self.assertIsNone(self.store.find_customer('0').next)
+        self.assertIsNone(self.store.find_customer('3'))
+        self.assertEqual(self.store.customer_count, 2)
+        self.assertEqual(self.store.close_c(0), [])
+
+    def test_readmit(self):
+        displaced = self.store.close_c(0)
+        displaced.reverse()
+        lines = self.store.readmit(displaced)
+        self.assertEqual([(c.cid, line) for c, line in zip(displaced, lines)],
+                         [('1', 2), ('2', 1), ('3', 2), ('4', 1), ('5', 2)])
+        self.assertEqual(self.store.customer_count, 7)
+        self.assertEqual(self.store.find_customer('2').join_time, 2)
+        self.assertEqual(self.store.find_cashier_line_index('5'), 2)
+        self.assertEqual(self.store.find_customer('kay').next, '2')
+
+
+class ColumnarCloseLineTest(CloseLineTest):
+    columnar = True
+
+
+class ColumnarCustomerIndexTest(CustomerIndexTest):
+    columnar = True
+
+
+class ColumnarAssignLineTest(AssignLineTest):
+    columnar = True
+
+
+class ColumnarStoreTest(unittest.TestCase):
+
+    def test_same_wait_as_objects(self):
+        rng = random.Random(7)
+        stores = [GroceryStore('input_files/config_111_10.json', False),
+                  GroceryStore('input_files/config_111_10.json', True)]
+        time = 0
+        for i in range(2000):
+            time += 1
+            if rng.random() < 0.55:
+                num_items = rng.randint(1, 12)
+                for store in stores:
+                    line = store.assign_line(Customer(str(i), num_items))
+                    if line is not None:
+                        store.add_customer(str(i), num_items, line)
+                        store.set_join_time(store.find_customer(str(i)),
+                                            time)
+            else:
+                line = rng.randrange(3)
+                for store in stores:
+                    if not store.is_empty(line):
+                        customer = store._customer(
+                            store.find_cashier_line(line)._customers[0])
+                        store.set_finish_time(customer,
+                                              time + store.process_c(line))
+                        store.remove_customer_front(line)
+        self.assertEqual(stores[0].max_wait, stores[1].max_wait)
+        self.assertEqual(stores[0].customer_count, stores[1].customer_count)
+        for i in range(2000):
+            self.assertEqual(stores[0].find_cashier_line_index(str(i)),
+                             stores[1].find_cashier_line_index(str(i)))
+
+    def test_closed_customers_are_copies(self):
+        store = GroceryStore('input_files/config_111_10.json', True)
+        store.add_customer('eos', 1, 0)
+        store.add_customer('yvonne', 9, 0)
+        store.set_join_time(store.find_customer('yvonne'), 3)
+        displaced = store.close_c(0)
+        store.add_customer('kay', 2, 1)
+        self.assertEqual(displaced[0].cid, 'yvonne')
+        self.assertEqual(displaced[0].num_items, 9)
+        self.assertEqual(displaced[0].join_time, 3)
+        self.assertIsNone(store.find_customer('eos').next)
+
+
+class RowQueueTest(unittest.TestCase):
+
+    def test_same_as_deque(self):
+        rng = random.Random(3)
+        queue = RowQueue()
+        expected = deque()
+        for row in range(5000):
+            choice = rng.random()
+            if choice < 0.5 or len(expected) == 0:
+                queue.append(row)
+                expected.append(row)
+            elif choice < 0.85:
+                self.assertEqual(queue.popleft(), expected.popleft())
+            else:
+                self.assertEqual(queue.pop(), expected.pop())
+            if len(expected) > 0:
+                self.assertEqual((queue[0], queue[-1]),
+                                 (expected[0], expected[-1]))
+            self.assertEqual(len(queue), len(expected))
+        self.assertEqual(list(queue), list(expected))
+        queue.clear()
+        self.assertEqual(len(queue), 0)
+        self.assertRaises(IndexError, queue.popleft)
+
+
+class StoreConfigTest(unittest.TestCase):
+
+    def test_load_is_cached(self):
+        config = StoreConfig.load('input_files/config_111_10.json')
+        self.assertIs(StoreConfig.load('input_files/config_111_10.json'),
+                      config)
+        self.assertEqual(config.as_dict(), {
+            'cashier_count': 1, 'express_count': 1, 'self_serve_count': 1,
+            'line_capacity': 10})
+
+    def test_reload_after_change(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'config.json')
+            with open(filename, 'w') as file:
+                json.dump(StoreConfig(1, 0, 0, 5).as_dict(), file)
+            self.assertEqual(StoreConfig.load(filename).line_capacity, 5)
+            with open(filename, 'w') as file:
+                json.dump(StoreConfig(1, 0, 0, 12).as_dict(), file)
+            self.assertEqual(StoreConfig.load(filename).line_capacity, 12)
+
+    def test_invalid(self):
+        for config in [{'cashier_count': 1, 'express_count': 0,
+                        'self_serve_count': 0},
+                       {'cashier_count': -1, 'express_count': 1,
+                        'self_serve_count': 0, 'line_capacity': 3},
+                       {'cashier_count': 1.5, 'express_count': 0,
+                        'self_serve_count': 0, 'line_capacity': 3},
+                       {'cashier_count': 0, 'express_count': 0,
+                        'self_serve_count': 0, 'line_capacity': 3}]:
+            self.assertRaises(ValueError, StoreConfig.from_dict, config)
+
+    def test_stores_do_not_share_lines(self):
+        config = StoreConfig(1, 1, 1, 10)
+        first = GroceryStore(config)
+        second = GroceryStore(config)
+        first.add_customer('a', 1, 0)
+        self.assertTrue(second.is_empty(0))
+        self.assertEqual(second.assign_line(Customer('b', 1)), 0)
+        self.assertEqual(first.assign_line(Customer('b', 1)), 1)
+
+    def test_reset(self):
+        for columnar in [False, True]:
+            store = GroceryStore('input_files/config_111_10.json', columnar)
+            for i in range(5):
+                store.add_customer(str(i), 1 + i * 3, store.assign_line(
+                    Customer(str(i), 1 + i * 3)))
+            store.close_c(0)
+            store.reset()
+            self.assertEqual(store.customer_count, 0)
+            self.assertEqual(store.lines_served, [0, 0, 0])
+            self.assertIsNone(store.find_customer('0'))
+            for line in range(3):
+                self.assertTrue(store.is_empty(line))
+                self.assertTrue(store.find_cashier_line(line).open)
+            self.assertEqual(store.assign_line(Customer('a', 1)), 0)
+            self.assertEqual(store.assign_line(Customer('b', 9)), 0)
+
+    def test_in_memory_simulation(self):
+        config = StoreConfig.from_dict(
+            GroceryStore('input_files/config_111_10.json').config)
+        self.assertEqual(
+            GroceryStoreSimulation(config).run('input_files/events_one.txt'),
+            GroceryStoreSimulation('input_files/config_111_10.json').run(
+                'input_files/events_one.txt'))
+
+
+if __name__ == '__main__':
+    unittest.main()
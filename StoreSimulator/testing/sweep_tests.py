@@ -0,0 +1,28 @@
+# Unit Tests for sweep
+# ---------------------------------------------
+import unittest
+from sweep import sweep, STAT_KEYS
+from simulation_mode_tests import normal_stats
+
+
+class SweepTest(unittest.TestCase):
+
+    def test_same_stats(self):
+        configs = ['input_files/config_100_10.json',
+                   'input_files/config_111_10.json']
+        event_files = ['input_files/events_one.txt',
+                       'input_files/events_two.txt']
+        rows = sweep(configs, event_files, processes=2)
+        self.assertEqual(len(rows), 4)
+        i = 0
+        for config in configs:
+            for events in event_files:
+                expected = normal_stats(config, events)
+                self.assertEqual(rows[i]['event_file'], events)
+                for key in STAT_KEYS:
+                    self.assertEqual(rows[i][key], expected[key])
+                i += 1
+
+
+if __name__ == '__main__':
+    unittest.main()